@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import datetime
+import tabulator
+import tableschema
+import numpy as np
+import pandas as pd
+import tableschema_pandas
+from tableschema_pandas import Storage
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Module API
+
+def main(argv=None):
+    """Run benchmarks or compare two runs
+
+    Examples:
+
+        $ PYTHONPATH=. python benchmarks/run.py run --sizes 1000 100000 --output base.json
+        $ PYTHONPATH=. python benchmarks/run.py run --workloads types json --output head.json
+        $ PYTHONPATH=. python benchmarks/run.py compare base.json head.json
+
+    """
+    parser = argparse.ArgumentParser(description='tableschema-pandas benchmarks')
+    commands = parser.add_subparsers(dest='command')
+    run_parser = commands.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                            help='numbers of rows of synthetic workloads (up to 1e7)')
+    run_parser.add_argument('--workloads', nargs='+', default=sorted(WORKLOADS) + ['data'],
+                            help='synthetic workloads and/or "data" for bundled data files')
+    run_parser.add_argument('--operations', nargs='+', default=OPERATIONS,
+                            help='storage operations to measure')
+    run_parser.add_argument('--repeat', type=int, default=3,
+                            help='number of timed repeats (the fastest one is reported)')
+    run_parser.add_argument('--no-memory', action='store_true',
+                            help='skip the extra pass measuring peak memory with tracemalloc')
+    run_parser.add_argument('--output', help='path to save results as JSON')
+    compare_parser = commands.add_parser('compare', help='compare two runs')
+    compare_parser.add_argument('base', help='results of a base run')
+    compare_parser.add_argument('head', help='results of a compared run')
+    options = parser.parse_args(argv)
+
+    # Compare
+    if options.command == 'compare':
+        print_comparison(read_results(options.base), read_results(options.head))
+        return
+
+    # Run
+    if options.command != 'run':
+        parser.print_help()
+        return
+    results = {'meta': get_meta(), 'results': []}
+    for name, descriptor, rows in iter_workloads(options.workloads, options.sizes):
+        for result in measure(name, descriptor, rows, options):
+            results['results'].append(result)
+            print_result(result)
+    if options.output:
+        with io.open(options.output, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+def measure(name, descriptor, rows, options):
+    """Measure storage operations for a workload
+    """
+    timings = dict((operation, []) for operation in options.operations)
+    peaks = {}
+
+    # Time operations
+    for index in range(options.repeat):
+        for operation, seconds in run_operations(descriptor, rows, options.operations):
+            timings[operation].append(seconds)
+
+    # Measure peak memory
+    if tracemalloc is not None and not options.no_memory:
+        tracemalloc.start()
+        try:
+            for operation, _ in run_operations(descriptor, rows, options.operations,
+                                               on_start=tracemalloc_reset):
+                peaks[operation] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Collect results
+    for operation in options.operations:
+        yield {
+            'workload': name,
+            'rows': len(rows),
+            'operation': operation,
+            'seconds': min(timings[operation]),
+            'peak_bytes': peaks.get(operation),
+        }
+
+
+def run_operations(descriptor, rows, operations, on_start=None):
+    """Run storage operations yielding (operation, seconds) pairs
+    """
+    storage = Storage()
+    reflected = None
+    for operation in OPERATIONS:
+        gc.collect()
+        if on_start:
+            on_start()
+        start = TIMER()
+        if operation == 'create':
+            storage.create('bucket', descriptor)
+        elif operation == 'write':
+            storage.write('bucket', rows)
+            storage['bucket']
+        elif operation == 'iter':
+            for row in storage.iter('bucket'):
+                pass
+        elif operation == 'read':
+            storage.read('bucket')
+        elif operation == 'describe':
+            # A bucket registered without a descriptor restores it from data
+            reflected = Storage(dataframes={'bucket': storage['bucket']})
+            reflected.describe('bucket')
+        seconds = TIMER() - start
+        if operation in operations:
+            yield operation, seconds
+
+
+def tracemalloc_reset():
+    tracemalloc.clear_traces()
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+
+
+# Workloads
+
+def iter_workloads(names, sizes):
+    """Yield (name, descriptor, rows) for selected workloads
+    """
+    for name in names:
+        if name == 'data':
+            for item in iter_data_workloads():
+                yield item
+            continue
+        if name not in WORKLOADS:
+            raise ValueError('Unknown workload "%s"' % name)
+        descriptor, make_row = WORKLOADS[name]
+        for size in sizes:
+            randomizer = random.Random(size)
+            rows = [make_row(index, randomizer) for index in range(size)]
+            yield name, descriptor, rows
+
+
+def iter_data_workloads():
+    """Yield bundled data files as workloads (inferring missing descriptors)
+    """
+    for filename in sorted(os.listdir(DATA_PATH)):
+        if not filename.endswith('.csv'):
+            continue
+        path = os.path.join(DATA_PATH, filename)
+        with io.open(path, encoding='utf-8') as file:
+            delimiter = ';' if ';' in file.readline() else ','
+        with tabulator.Stream(path, headers=1, delimiter=delimiter) as stream:
+            headers = stream.headers
+            rows = stream.read()
+        descriptor_path = path.replace('.csv', '.json')
+        if os.path.exists(descriptor_path):
+            with io.open(descriptor_path, encoding='utf-8') as file:
+                descriptor = json.load(file)
+            descriptor.pop('foreignKeys', None)
+        else:
+            descriptor = tableschema.infer(rows, headers=headers)
+        yield 'data/%s' % filename, descriptor, rows
+
+
+def make_types_row(index, randomizer):
+    def nullable(value):
+        return '' if randomizer.random() < 0.1 else value
+    moment = BASE_DATETIME + datetime.timedelta(seconds=randomizer.randint(0, 10 ** 8))
+    return [
+        str(index),
+        nullable(str(randomizer.randint(-10 ** 6, 10 ** 6))),
+        nullable('%.3f' % randomizer.uniform(-10 ** 6, 10 ** 6)),
+        nullable(randomizer.choice(['true', 'false'])),
+        nullable(randomizer.choice(STRINGS)),
+        nullable(moment.strftime('%Y-%m-%dT%H:%M:%SZ')),
+        nullable(moment.strftime('%Y-%m-%d')),
+        nullable(moment.strftime('%H:%M:%S')),
+        str(moment.year),
+    ]
+
+
+def make_composite_row(index, randomizer):
+    return [
+        STRINGS[index % len(STRINGS)],
+        str(index),
+        '%.2f' % randomizer.random(),
+        randomizer.choice(['a', 'b', 'c']),
+    ]
+
+
+def make_json_row(index, randomizer):
+    value = randomizer.randint(0, 1000)
+    return [
+        str(index),
+        json.dumps({'value': value, 'tags': STRINGS[:value % 4]}),
+        json.dumps(STRINGS[:value % 5]),
+        json.dumps({'type': 'Point', 'coordinates': [value % 90, value % 180]}),
+        '%s,%s' % (value % 180, value % 90),
+    ]
+
+
+OPERATIONS = ['create', 'write', 'iter', 'read', 'describe']
+TIMER = getattr(time, 'perf_counter', time.time)  # Python 2 has only wall clock time
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+BASE_DATETIME = datetime.datetime(2000, 1, 1)
+STRINGS = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', '中国人']
+WORKLOADS = {
+    'types': ({
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'integer', 'type': 'integer'},
+            {'name': 'number', 'type': 'number'},
+            {'name': 'boolean', 'type': 'boolean'},
+            {'name': 'string', 'type': 'string'},
+            {'name': 'datetime', 'type': 'datetime'},
+            {'name': 'date', 'type': 'date'},
+            {'name': 'time', 'type': 'time'},
+            {'name': 'year', 'type': 'year'},
+        ],
+        'primaryKey': 'id',
+    }, make_types_row),
+    'composite': ({
+        'fields': [
+            {'name': 'name', 'type': 'string'},
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'number', 'type': 'number'},
+            {'name': 'kind', 'type': 'string', 'constraints': {'enum': ['a', 'b', 'c']}},
+        ],
+        'primaryKey': ['name', 'id'],
+    }, make_composite_row),
+    'json': ({
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'object', 'type': 'object'},
+            {'name': 'array', 'type': 'array'},
+            {'name': 'geojson', 'type': 'geojson'},
+            {'name': 'geopoint', 'type': 'geopoint'},
+        ],
+        'primaryKey': 'id',
+    }, make_json_row),
+}
+
+
+# Results
+
+def get_meta():
+    return {
+        'created': datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'tableschema_pandas': tableschema_pandas.__version__,
+        'tableschema': getattr(tableschema, '__version__', None),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def read_results(path):
+    with io.open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def print_result(result):
+    peak = result['peak_bytes']
+    print('%-20s %9s rows  %-9s %10.4fs  %s' % (
+        result['workload'], result['rows'], result['operation'], result['seconds'],
+        '%.1f MiB' % (peak / 2 ** 20) if peak is not None else '-'))
+
+
+def print_comparison(base, head):
+    def key(result):
+        return (result['workload'], result['rows'], result['operation'])
+    base_results = dict((key(result), result) for result in base['results'])
+    print('%-20s %9s  %-9s %10s %10s %8s %8s' % (
+        'workload', 'rows', 'operation', 'base', 'head', 'time', 'memory'))
+    for result in head['results']:
+        base_result = base_results.get(key(result))
+        if base_result is None:
+            continue
+        print('%-20s %9s  %-9s %9.4fs %9.4fs %8s %8s' % (
+            result['workload'], result['rows'], result['operation'],
+            base_result['seconds'], result['seconds'],
+            format_ratio(base_result['seconds'], result['seconds']),
+            format_ratio(base_result['peak_bytes'], result['peak_bytes'])))
+
+
+def format_ratio(base, head):
+    if not base or head is None:
+        return '-'
+    return 'x%.2f' % (head / base)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -25,6 +25,9 @@ INSTALL_REQUIRES = [
     'tableschema>=1.1',
     'isodate>=0.6',
 ]
+ARROW_REQUIRE = [
+    'pyarrow>=1.0',
+]
 TESTS_REQUIRE = [
     'mock',
     'pylama',
@@ -45,7 +48,7 @@ setup(
     include_package_data=True,
     install_requires=INSTALL_REQUIRES,
     tests_require=TESTS_REQUIRE,
-    extras_require={'develop': TESTS_REQUIRE},
+    extras_require={'arrow': ARROW_REQUIRE, 'develop': TESTS_REQUIRE},
     zip_safe=False,
     long_description=README,
     long_description_content_type='text/markdown',
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import asyncio
+import functools
+import itertools
+
+
+# Module API
+
+class AsyncStorageMixin(object):
+    """Asyncio counterparts of storage methods (Python 3.6+)
+
+    Rows are converted and restored chunk by chunk on an executor
+    so the event loop stays responsive. Only one chunk is processed
+    while the next one is collected, so memory stays bounded.
+
+    """
+
+    # Public
+
+    async def awrite(self, bucket, rows, chunk_size=10000, executor=None, mode='append'):
+        """Write rows to bucket without blocking the event loop
+
+        Every chunk is written as `storage.write` does it, so a row failed
+        to be cast stops writing after previous chunks have been written.
+
+        # Arguments
+            bucket (str): bucket name
+            rows (list[]): rows (an async iterable or an iterable)
+            chunk_size (int): number of rows written at once
+            executor (concurrent.futures.Executor):
+                executor to write chunks on (the loop's default one by default)
+            mode (str): `append`, `upsert` or `ignore` (see `storage.write`)
+
+        """
+        loop = asyncio.get_event_loop()
+        pending = None
+        written = False
+        async for chunk in _iter_chunks(rows, chunk_size):
+            # The next chunk is collected while the previous one is written
+            if pending is not None:
+                await pending
+            pending = loop.run_in_executor(executor, self.write, bucket, chunk, mode)
+            written = True
+        if pending is not None:
+            await pending
+        if not written:
+            await loop.run_in_executor(executor, self.write, bucket, [], mode)
+
+    async def aiter(self, bucket, batch_size=10000, batches=False,
+                    fields=None, where=None, executor=None):
+        """Iterate over bucket rows without blocking the event loop
+
+        # Arguments
+            bucket (str): bucket name
+            batch_size (int): number of rows restored at once
+            batches (bool): yield batches of rows instead of rows
+            fields (str[]): names of fields to yield (all by default)
+            where (tuple[]): conditions rows have to meet
+            executor (concurrent.futures.Executor):
+                executor to restore batches on (the loop's default one by default)
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket, a field or an operator doesn't exist
+
+        # Returns
+            async iterator: rows or batches of rows
+
+        """
+        loop = asyncio.get_event_loop()
+        # Snapshot of the bucket is taken (and rows selected) on the executor too
+        iterator = await loop.run_in_executor(executor, functools.partial(
+            self.iter_batches, bucket, batch_size=batch_size, fields=fields, where=where))
+        future = loop.run_in_executor(executor, next, iterator, None)
+        while True:
+            batch = await future
+            if batch is None:
+                break
+            # The next batch is restored while this one is consumed
+            future = loop.run_in_executor(executor, next, iterator, None)
+            if batches:
+                yield batch
+            else:
+                for row in batch:
+                    yield row
+
+    async def aread(self, bucket, fields=None, where=None, executor=None):
+        """Read bucket rows without blocking the event loop
+
+        # Arguments
+            bucket (str): bucket name
+            fields (str[]): names of fields to read (all by default)
+            where (tuple[]): conditions rows have to meet
+            executor (concurrent.futures.Executor):
+                executor to restore batches on (the loop's default one by default)
+
+        # Returns
+            list[]: rows
+
+        """
+        rows = []
+        async for batch in self.aiter(
+                bucket, batches=True, fields=fields, where=where, executor=executor):
+            rows.extend(batch)
+        return rows
+
+
+# Internal
+
+async def _iter_chunks(rows, chunk_size):
+    if hasattr(rows, '__aiter__'):
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    else:
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import json
+import shutil
+import collections
+import numpy as np
+import pandas as pd
+
+
+# Module API
+
+def write_dataframe(path, dataframe):
+    """Write dataframe to a directory as a file per column
+
+    Numeric, boolean, datetime, timedelta and period arrays are stored as
+    plain `.npy` files so they can be memory-mapped on read. Object arrays
+    are pickled.
+
+    # Arguments
+        path (str): directory path (replaced if it exists)
+        dataframe (pandas.DataFrame): dataframe to write
+
+    """
+
+    # Write to a temporary directory
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        shutil.rmtree(temp_path)
+    os.makedirs(temp_path)
+    writer = _ArrayWriter(temp_path)
+    layout = {
+        'index': _write_index(writer, dataframe.index),
+        'columns': [[name, writer.write(dataframe[name].array)]
+                    for name in dataframe.columns],
+    }
+    write_json(os.path.join(temp_path, 'frame.json'), layout)
+    replace_directory(temp_path, path)
+
+
+def read_dataframe(path, mmap=False):
+    """Read dataframe written by `write_dataframe`
+
+    # Arguments
+        path (str): directory path
+        mmap (bool):
+            memory-map numeric, boolean and temporal arrays (copy-on-write)
+            instead of loading them to memory
+
+    # Returns
+        pandas.DataFrame: dataframe
+
+    """
+    layout = read_json(os.path.join(path, 'frame.json'))
+    reader = _ArrayReader(path, mmap=mmap)
+    index = _read_index(reader, layout['index'])
+    data = collections.OrderedDict()
+    for name, spec in layout['columns']:
+        data[name] = reader.read(spec)
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def replace_directory(source, target):
+    """Replace target directory by source one (removing the target)
+    """
+    old_path = target + '.old'
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path)
+    if os.path.exists(target):
+        os.rename(target, old_path)
+    os.rename(source, target)
+    if os.path.exists(old_path):
+        shutil.rmtree(old_path)
+
+
+def write_json(path, value):
+    """Write JSON file atomically
+    """
+    temp_path = path + '.tmp'
+    with io.open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(json.dumps(value, ensure_ascii=False))
+    _replace(temp_path, path)
+
+
+def read_json(path):
+    """Read JSON file
+    """
+    with io.open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+# Internal
+
+class _ArrayWriter(object):
+
+    # Public
+
+    def __init__(self, path):
+        self.__path = path
+        self.__count = 0
+
+    def write(self, array):
+
+        # Numpy arrays wrapped by pandas
+        if type(array) is getattr(pd.arrays, 'PandasArray', None):
+            array = array.to_numpy()
+
+        # Categorical
+        if isinstance(array, pd.Categorical):
+            return {
+                'type': 'categorical',
+                'codes': self.write(array.codes),
+                'categories': self.write(array.categories.array),
+                'ordered': bool(array.ordered),
+            }
+
+        # Masked (nullable integer, boolean)
+        if isinstance(array, _MASKED_ARRAYS):
+            values = array.to_numpy(dtype=array.dtype.numpy_dtype, na_value=0)
+            return {
+                'type': 'masked',
+                'class': type(array).__name__,
+                'values': self.write(values),
+                'mask': self.write(np.asarray(array.isna())),
+            }
+
+        # Datetimes with a time zone and periods (stored as int64 values)
+        if isinstance(array.dtype, pd.DatetimeTZDtype):
+            return {
+                'type': 'datetimetz',
+                'tz': str(array.dtype.tz),
+                'values': self.write(array.asi8.view('datetime64[ns]')),
+            }
+        if isinstance(array.dtype, pd.PeriodDtype):
+            return {
+                'type': 'period',
+                'freq': array.freqstr,
+                'values': self.write(array.asi8),
+            }
+
+        # Other extension arrays
+        if pd.api.types.is_extension_array_dtype(array.dtype):
+            return {
+                'type': 'extension',
+                'dtype': str(array.dtype),
+                'values': self.write(np.asarray(array, dtype=object)),
+            }
+
+        # Numpy
+        array = np.asarray(array)
+        name = '%s.npy' % self.__count
+        self.__count += 1
+        np.save(os.path.join(self.__path, name), array, allow_pickle=array.dtype.hasobject)
+        return {'type': 'numpy', 'file': name}
+
+
+class _ArrayReader(object):
+
+    # Public
+
+    def __init__(self, path, mmap=False):
+        self.__path = path
+        self.__mmap = mmap
+
+    def read(self, spec):
+
+        # Categorical
+        if spec['type'] == 'categorical':
+            return pd.Categorical.from_codes(
+                self.read(spec['codes']),
+                categories=self.read(spec['categories']),
+                ordered=spec['ordered'])
+
+        # Masked (nullable integer, boolean)
+        if spec['type'] == 'masked':
+            array_class = getattr(pd.arrays, spec['class'])
+            return array_class(
+                np.asarray(self.read(spec['values'])),
+                np.asarray(self.read(spec['mask'])))
+
+        # Datetimes with a time zone and periods
+        if spec['type'] == 'datetimetz':
+            dtype = pd.DatetimeTZDtype(tz=spec['tz'])
+            return pd.arrays.DatetimeArray(np.asarray(self.read(spec['values'])), dtype=dtype)
+        if spec['type'] == 'period':
+            return pd.arrays.PeriodArray(np.asarray(self.read(spec['values'])), freq=spec['freq'])
+
+        # Other extension arrays
+        if spec['type'] == 'extension':
+            return pd.array(self.read(spec['values']), dtype=spec['dtype'])
+
+        # Numpy
+        path = os.path.join(self.__path, spec['file'])
+        try:
+            return np.load(path, mmap_mode='c' if self.__mmap else None)
+        except ValueError:
+            # Object arrays can't be memory-mapped
+            return np.load(path, allow_pickle=True)
+
+
+def _write_index(writer, index):
+    if isinstance(index, pd.RangeIndex):
+        return {
+            'type': 'range',
+            'name': index.name,
+            'range': [_range_attr(index, 'start'),
+                      _range_attr(index, 'stop'),
+                      _range_attr(index, 'step')],
+        }
+    levels = [index.get_level_values(level).array for level in range(index.nlevels)]
+    return {
+        'type': 'multi' if isinstance(index, pd.MultiIndex) else 'index',
+        'names': list(index.names),
+        'levels': [writer.write(level) for level in levels],
+    }
+
+
+def _read_index(reader, spec):
+    if spec['type'] == 'range':
+        return pd.RangeIndex(*spec['range'], name=spec['name'])
+    levels = [reader.read(level) for level in spec['levels']]
+    if spec['type'] == 'multi':
+        return pd.MultiIndex.from_arrays(levels, names=spec['names'])
+    return pd.Index(levels[0], name=spec['names'][0])
+
+
+def _range_attr(index, name):
+    # RangeIndex attributes were private before pandas@0.25
+    if hasattr(index, name):
+        return int(getattr(index, name))
+    return int(getattr(index, '_' + name))
+
+
+def _replace(source, target):
+    getattr(os, 'replace', os.rename)(source, target)
+
+
+_MASKED_ARRAYS = tuple(getattr(pd.arrays, name)
+                       for name in ['IntegerArray', 'BooleanArray', 'FloatingArray']
+                       if hasattr(pd.arrays, name))
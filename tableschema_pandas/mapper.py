@@ -4,13 +4,22 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import re
 import six
+import pickle
 import json
+import json.scanner
+import decimal
+import functools
+import operator
+import collections
 import isodate
 import datetime
+import threading
 import tableschema
 import numpy as np
 import pandas as pd
+from .stats import NullStats
 
 # Starting from pandas@0.24 there is the new API
 # https://github.com/frictionlessdata/tableschema-pandas-py/issues/29
@@ -23,75 +32,404 @@ except ImportError:
 # Module API
 
 class Mapper(object):
+    """Mapper between Table Schema and Pandas
+
+    String fields with an `enum` constraint are mapped to categoricals
+    with categories taken from the constraint.
+
+    Strings of object, array and geojson fields are decoded column by
+    column: every distinct string is decoded once and rows of a batch having
+    the same string share the decoded value (across written batches too, for
+    up to `intern_size` recently decoded strings if it's enabled). Restored
+    values are copies so changing them doesn't change other rows.
+
+    # Arguments
+        nullable (bool):
+            map integer, boolean and string fields to pandas nullable
+            dtypes (`Int64`, `boolean`, `string`) instead of numpy ones
+        categorical_threshold (float):
+            also map string fields to categoricals if a ratio of distinct
+            values to all values in written rows is under this threshold
+        cache_size (int):
+            maximum number of compiled descriptors kept in the cache
+            (the least recently used ones are evicted first)
+        sample_size (int):
+            number of non-null values of object columns inspected to
+            restore their types (by default all values are inspected)
+        infer_constraints (bool):
+            restore `required` and `unique` constraints of columns
+            having no nulls or no duplicates
+        compact (bool):
+            store integer and year fields using the smallest integer dtype
+            (`int8` to `int32` or unsigned ones) fitting `minimum` and
+            `maximum` constraints if both are declared or values otherwise
+        compact_floats (bool):
+            store number fields as `float32` (lossy for values having
+            more than 7 significant digits)
+        native_temporal (bool):
+            store date fields as `datetime64`, time and duration fields as
+            `timedelta64`, yearmonth fields as monthly periods and datetime
+            fields as UTC `datetime64` with a time zone (durations having
+            years or months are kept as objects)
+        intern_size (int):
+            maximum number of decoded JSON strings kept to be shared
+            by rows of later batches (`0`, the default, disables it)
+        validate (bool):
+            cast values without checking field constraints (values outside
+            of an `enum` are kept as extra categories) leaving them to be
+            checked column-wise by `mapper.validate_dataframes`
+
+    """
 
     # Public
 
-    def convert_descriptor_and_rows(self, descriptor, rows):
+    def __init__(self, nullable=False, categorical_threshold=None, cache_size=128,
+                 sample_size=None, infer_constraints=False, compact=False,
+                 compact_floats=False, native_temporal=False, intern_size=0,
+                 validate=False):
+        self.__nullable = nullable
+        self.__categorical_threshold = categorical_threshold
+        self.__cache_size = cache_size
+        self.__sample_size = sample_size
+        self.__infer_constraints = infer_constraints
+        self.__compact = compact
+        self.__compact_floats = compact_floats
+        self.__native_temporal = native_temporal
+        self.__intern_size = intern_size
+        self.__validate = validate
+        self.__plans = collections.OrderedDict()
+        self.__plans_lock = threading.Lock()
+        self.__interned = collections.OrderedDict()
+        self.__interned_lock = threading.Lock()
+
+    def convert_descriptor_and_rows(self, descriptor, rows, stats=None):
         """Convert descriptor and rows to Pandas
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            rows (list[]): rows
+            stats (Stats): stats to record phases and cast fallbacks to
+
+        # Returns
+            pandas.DataFrame: dataframe
+
         """
-        schema = tableschema.Schema(descriptor)
+        stats = stats if stats is not None else NullStats()
+        plan = self.compile_descriptor(descriptor)
 
-        # Get data/index
-        data_rows = []
-        index_rows = []
-        jtstypes_map = {}
-        for row in rows:
-            data_values = []
-            index_values = []
-            for field, value in zip(schema.fields, row):
-                try:
-                    if isinstance(value, float) and np.isnan(value):
-                        value = None
-                    if value and field.type == 'integer':
-                        value = int(value)
-                    value = field.cast_value(value)
-                except tableschema.exceptions.CastError:
-                    value = json.loads(value)
-                # http://pandas.pydata.org/pandas-docs/stable/gotchas.html#support-for-integer-na
-                if value is None and field.type in ('number', 'integer'):
-                    jtstypes_map[field.name] = 'number'
-                    value = np.NaN
-                if field.name in schema.primary_key:
-                    index_values.append(value)
-                else:
-                    data_values.append(value)
-            if len(schema.primary_key) == 1:
-                index_rows.append(index_values[0])
-            elif len(schema.primary_key) > 1:
-                index_rows.append(tuple(index_values))
-            data_rows.append(tuple(data_values))
+        # Get columns
+        with stats.phase('transpose'):
+            columns = _transpose_rows(rows, len(plan.columns))
+
+        return self.convert_descriptor_and_columns(descriptor, columns, stats=stats)
+
+    def convert_descriptor_and_columns(self, descriptor, columns, stats=None):
+        """Convert descriptor and columns to Pandas
+
+        Columns are cast the way rows are. Arrays already having a field
+        dtype (e.g. float numbers parsed by a CSV reader) are taken as is
+        if the field has no constraints to check.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            columns (numpy.ndarray[]): arrays of values in field order
+            stats (Stats): stats to record phases and cast fallbacks to
+
+        # Returns
+            pandas.DataFrame: dataframe
+
+        """
+        stats = stats if stats is not None else NullStats()
+        plan = self.compile_descriptor(descriptor)
+        size = len(columns[0]) if columns else 0
+        stats.rows += size
+
+        # Cast columns
+        casts = {}
+        errors = []
+        with stats.phase('cast'):
+            for column, values in zip(plan.columns, columns):
+                parts, error = self.__cast_column(column, values, stats)
+                if error is not None:
+                    errors.append((error[0], column.position, error[1]))
+                casts[column.name] = parts
+
+        # Raise an error of the first failed cell (row by row)
+        if errors:
+            raise min(errors, key=lambda error: error[:2])[2]
+
+        # Get dtypes
+        dtypes = {}
+        for column in plan.columns:
+            dtype = column.dtype
+            # http://pandas.pydata.org/pandas-docs/stable/gotchas.html#support-for-integer-na
+            if column.null_dtype is not None:
+                if any(_has_nulls(array) for mask, array in casts[column.name]):
+                    dtype = column.null_dtype
+            dtypes[column.name] = dtype
 
         # Create index
         index = None
-        if schema.primary_key:
-            if len(schema.primary_key) == 1:
-                index_class = pd.Index
-                index_field = schema.get_field(schema.primary_key[0])
-                index_dtype = self.convert_type(index_field.type)
-                if field.type in ['datetime', 'date']:
-                    index_class = pd.DatetimeIndex
-                index = index_class(index_rows, name=index_field.name, dtype=index_dtype)
-            elif len(schema.primary_key) > 1:
-                index = pd.MultiIndex.from_tuples(index_rows, names=schema.primary_key)
-
-        # Create dtypes/columns
-        dtypes = []
-        columns = []
-        for field in schema.fields:
-            if field.name not in schema.primary_key:
-                field_name = field.name
-                if six.PY2:
-                    field_name = field.name.encode('utf-8')
-                dtype = self.convert_type(jtstypes_map.get(field.name, field.type))
-                dtypes.append((field_name, dtype))
-                columns.append(field.name)
+        with stats.phase('index'):
+            if plan.index_columns:
+                index = self.__create_index(plan, casts, size)
+
+        # Create data
+        data = collections.OrderedDict()
+        with stats.phase('data'):
+            for column in plan.data_columns:
+                if column.temporal is not None:
+                    data[column.name] = _merge_temporal_parts(column, casts[column.name], size)
+                    continue
+                try:
+                    data[column.name] = _merge_parts(
+                        casts[column.name], size, dtypes[column.name], numeric=column.numeric)
+                except (TypeError, ValueError, OverflowError):
+                    self.__raise_row_error(plan, casts, dtypes, size)
+                    raise
+                if column.numeric or column.field.type == 'year':
+                    data[column.name] = self.__convert_compact(column, data[column.name])
+                if column.field.type == 'string':
+                    data[column.name] = self.__convert_categorical(
+                        column.field, data[column.name])
 
         # Create dataframe
-        array = np.array(data_rows, dtype=dtypes)
-        dataframe = pd.DataFrame(array, index=index, columns=columns)
+        with stats.phase('dataframe'):
+            # Ordered data gives columns (listing them makes pandas copy extension arrays)
+            dataframe = pd.DataFrame(data, index=index)
 
         return dataframe
 
+    def convert_categoricals(self, descriptor, dataframes):
+        """Convert string columns of dataframes to categoricals as a whole
+
+        Dataframes converted (e.g. by workers) from parts of written rows
+        without a categorical threshold get categoricals the way a single
+        dataframe converted from all of them would (sharing categories).
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            dataframes (pandas.DataFrame[]): dataframes converted from the descriptor
+
+        # Returns
+            pandas.DataFrame[]: dataframes
+
+        """
+        if self.__categorical_threshold is None or not dataframes:
+            return dataframes
+        plan = self.compile_descriptor(descriptor)
+        for column in plan.data_columns:
+            if column.field.type != 'string' or 'enum' in column.field.constraints:
+                continue
+            values = pd.concat([pd.Series(dataframe[column.name].array)
+                                for dataframe in dataframes], ignore_index=True)
+            categorical = self.__convert_categorical(column.field, values.array)
+            if not isinstance(categorical, pd.Categorical):
+                continue
+            for dataframe in dataframes:
+                dataframe[column.name] = pd.Categorical(
+                    dataframe[column.name].array, categories=categorical.categories)
+        return dataframes
+
+    def convert_keys(self, descriptor, keys):
+        """Convert primary key values to Pandas
+
+        Keys are cast the way written rows are so they can be looked up
+        in the index of a dataframe converted from the descriptor.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            keys (list): key values (lists of values for a composite key)
+
+        # Raises
+            tableschema.exceptions.StorageError: if descriptor has no primary key
+
+        # Returns
+            pandas.Index: index (`pandas.MultiIndex` for a composite key)
+
+        """
+        plan = self.compile_descriptor(descriptor)
+        if not plan.index_columns:
+            message = 'Descriptor has no primary key'
+            raise tableschema.exceptions.StorageError(message)
+
+        # Cast keys
+        casts = {}
+        errors = []
+        if len(plan.index_columns) == 1:
+            keys = [[key] for key in keys]
+        columns = _transpose_rows(keys, len(plan.index_columns))
+        for position, (column, values) in enumerate(zip(plan.index_columns, columns)):
+            parts, error = self.__cast_column(column, values, NullStats())
+            if error is not None:
+                errors.append((error[0], position, error[1]))
+            casts[column.name] = parts
+        if errors:
+            raise min(errors, key=lambda error: error[:2])[2]
+
+        return self.__create_index(plan, casts, len(keys))
+
+    def convert_values(self, descriptor, name, values):
+        """Convert field values to Pandas
+
+        Values are cast the way written rows are so they can be compared
+        with the field column of a dataframe converted from the descriptor.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            name (str): field name
+            values (list): values
+
+        # Raises
+            tableschema.exceptions.StorageError: if there is no such field or values can't be cast
+
+        # Returns
+            numpy.ndarray: values
+
+        """
+        plan = self.compile_descriptor(descriptor)
+        if name not in plan.schema.field_names:
+            message = 'Field "%s" doesn\'t exist' % name
+            raise tableschema.exceptions.StorageError(message)
+        column = plan.columns[plan.schema.field_names.index(name)]
+        parts, error = self.__cast_column(column, _object_array(values), NullStats())
+        if error is not None:
+            message = 'Value "%s" can\'t be cast to field "%s"' % (values[error[0]], name)
+            raise tableschema.exceptions.StorageError(message)
+        return _merge_typed_parts(column, parts, len(values))
+
+    def validate_dataframes(self, descriptor, dataframes, previous=None, check_keys=True,
+                            stats=None):
+        """Check field constraints of dataframes column by column
+
+        A constraint is checked for a whole column at once: using array
+        operations where the column dtype allows it (ranges and enums of
+        numbers and datetimes, lengths, patterns and enums of strings) and
+        once per distinct value otherwise. Values of `unique` fields and
+        primary keys are compared with values of previous dataframes too.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            dataframes (pandas.DataFrame[]): dataframes converted from the descriptor
+            previous (pandas.DataFrame[]): dataframes the checked ones follow
+            check_keys (bool): check that primary keys are present and unique
+            stats (Stats): stats to record phases to
+
+        # Returns
+            dict[]: failed constraints in field order (the primary key last)
+            having `field` (a list of names for the primary key), `constraint`
+            and `rows` (positions of failed rows in the dataframes) keys
+
+        """
+        stats = stats if stats is not None else NullStats()
+        plan = self.compile_descriptor(descriptor)
+        previous = previous or []
+        errors = []
+
+        with stats.phase('validate'):
+
+            # Field constraints
+            for column in plan.columns:
+                names = [name for name in _CONSTRAINTS if name in column.field.constraints]
+                if not names or not dataframes:
+                    continue
+                values = _get_column_values(dataframes, column)
+                nulls = np.asarray(values.isnull())
+                for name in names:
+                    if name == 'required':
+                        failed = nulls
+                    elif name == 'unique':
+                        failed = _find_duplicates(values, nulls, [
+                            _get_column_values([dataframe], column) for dataframe in previous])
+                    else:
+                        failed = self.__check_constraint(column, name, values, nulls)
+                    if failed.any():
+                        errors.append({
+                            'field': column.name,
+                            'constraint': name,
+                            'rows': np.flatnonzero(failed).tolist(),
+                        })
+
+            # Primary key
+            if check_keys and plan.index_columns and dataframes:
+                failed = _find_duplicate_keys(
+                    [dataframe.index for dataframe in dataframes],
+                    [dataframe.index for dataframe in previous])
+                if failed.any():
+                    errors.append({
+                        'field': plan.schema.primary_key,
+                        'constraint': 'primaryKey',
+                        'rows': np.flatnonzero(failed).tolist(),
+                    })
+
+        return errors
+
+    def compile_descriptor(self, descriptor):
+        """Compile descriptor to a conversion plan
+
+        Plans are cached by descriptor contents so converting many batches
+        of the same descriptor parses it and resolves per field casts and
+        dtypes only once.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+
+        # Returns
+            namedtuple: conversion plan with `schema`, `columns`,
+            `index_columns` and `data_columns` attributes
+
+        """
+
+        # Get cached
+        key = json.dumps(descriptor, sort_keys=True, default=repr)
+        with self.__plans_lock:
+            plan = self.__plans.pop(key, None)
+            if plan is not None:
+                self.__plans[key] = plan
+                return plan
+
+        # Compile columns
+        columns = []
+        schema = tableschema.Schema(descriptor)
+        for position, field in enumerate(schema.fields):
+            plain = _is_plain(field) or self.__validate
+            temporal = _TEMPORALS.get(field.type) if self.__native_temporal else None
+            string_cast = _STRING_CASTS.get(field.type)
+            if temporal is not None:
+                string_cast = temporal.string_cast
+            null_dtype = None
+            if field.type == 'number' or (field.type == 'integer' and not self.__nullable):
+                null_dtype = self.convert_type('number')
+            columns.append(_Column(
+                name=field.name,
+                field=field,
+                plain_field=_get_plain_field(field),
+                position=position,
+                primary=field.name in schema.primary_key,
+                numeric=field.type in ('number', 'integer'),
+                dtype=self.convert_type(field.type),
+                null_dtype=null_dtype,
+                compact_dtype=_get_constraints_dtype(field),
+                string_cast=string_cast if plain else None,
+                native_cast=_NATIVE_CASTS.get(field.type) if plain else None,
+                temporal=temporal))
+
+        # Compile plan
+        plan = _Plan(
+            schema=schema,
+            columns=columns,
+            index_columns=[
+                columns[schema.field_names.index(name)] for name in schema.primary_key],
+            data_columns=[column for column in columns if not column.primary])
+
+        # Cache plan
+        with self.__plans_lock:
+            self.__plans[key] = plan
+            while len(self.__plans) > self.__cache_size:
+                self.__plans.popitem(last=False)
+
+        return plan
+
     def convert_type(self, type):
         """Convert type to Pandas
         """
@@ -115,6 +453,14 @@ class Mapper(object):
             'yearmonth': np.dtype('O'),
         }
 
+        # Nullable mapping
+        if self.__nullable and type in _NULLABLE_DTYPES:
+            return pd.api.types.pandas_dtype(_NULLABLE_DTYPES[type])
+
+        # Native temporal mapping
+        if self.__native_temporal and type in _TEMPORALS:
+            return pd.api.types.pandas_dtype(_TEMPORALS[type].pandas_dtype)
+
         # Get type
         if type not in mapping:
             message = 'Type "%s" is not supported' % type
@@ -122,17 +468,123 @@ class Mapper(object):
 
         return mapping[type]
 
+    def convert_arrow_table(self, descriptor, table):
+        """Convert descriptor and Arrow table to Pandas
+
+        Columns are taken by field names and converted to the field dtypes
+        without going through Python objects where Arrow and Pandas share
+        the memory layout (numeric and timestamp columns). Values are not
+        validated against field constraints.
+
+        # Arguments
+            descriptor (dict): table schema descriptor
+            table (pyarrow.Table): Arrow table
+
+        # Returns
+            pandas.DataFrame: dataframe
+
+        """
+        plan = self.compile_descriptor(descriptor)
+
+        # Convert columns
+        arrays = {}
+        for column in plan.columns:
+            chunked_array = table.column(column.name)
+            if column.temporal is not None:
+                arrays[column.name] = self.__convert_arrow_temporal(column, chunked_array)
+                continue
+            if column.dtype.kind == 'O' and column.field.type != 'string':
+                values = _object_array(chunked_array.to_pylist())
+                if column.field.type in _JSON_TYPES:
+                    # JSON strings are decoded the way written ones are
+                    parts, error = self.__cast_column(column, values, NullStats())
+                    if error is not None:
+                        raise error[1]
+                    values = _merge_typed_parts(column, parts, len(values))
+                arrays[column.name] = values
+                continue
+            array = chunked_array.to_pandas()
+            if pdc.is_datetime64tz_dtype(array.dtype):
+                array = array.dt.tz_convert(None)
+            dtype = column.dtype
+            if column.null_dtype is not None and array.isnull().any():
+                dtype = column.null_dtype
+            arrays[column.name] = array.astype(dtype, copy=False).array
+
+        # Create index
+        index = None
+        if len(plan.index_columns) == 1:
+            column = plan.index_columns[0]
+            index = pd.Index(arrays[column.name], name=column.name)
+        elif plan.index_columns:
+            index = pd.MultiIndex.from_arrays(
+                [arrays[column.name] for column in plan.index_columns],
+                names=[column.name for column in plan.index_columns])
+
+        # Create data
+        data = collections.OrderedDict()
+        for column in plan.data_columns:
+            data[column.name] = arrays[column.name]
+            if column.numeric or column.field.type == 'year':
+                data[column.name] = self.__convert_compact(column, data[column.name])
+            if column.field.type == 'string':
+                data[column.name] = self.__convert_categorical(column.field, data[column.name])
+
+        # Create dataframe
+        dataframe = pd.DataFrame(data, index=index, copy=False)
+
+        return dataframe
+
+    def convert_arrow_type(self, type):
+        """Convert type to Arrow
+
+        Types are mapped following `convert_type`. Geopoints are lists of
+        floats, and `object`, `array`, `geojson` and `any` values are JSON
+        strings (strings of `any` fields are kept as they are) so every
+        chunk of a bucket gets the same Arrow type. Other types without
+        an Arrow counterpart (`duration`, `yearmonth`) give `None` meaning
+        that an Arrow type is inferred from values.
+
+        # Arguments
+            type (str): table schema type
+
+        # Returns
+            pyarrow.DataType/None: Arrow type
+
+        """
+        pa = _import_pyarrow()
+        dtype = self.convert_type(type)
+        if type in ('date', 'time', 'yearmonth'):
+            return {'date': pa.date32(), 'time': pa.time64('us')}.get(type)
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            return pa.timestamp('ns', tz=str(dtype.tz))
+        if _is_extension(dtype):
+            return {'Int64': pa.int64(), 'boolean': pa.bool_(), 'string': pa.string()}[dtype.name]
+        if dtype.kind != 'O':
+            return pa.from_numpy_dtype(dtype)
+        if type in _JSON_TYPES or type == 'any':
+            return pa.string()
+        return {'string': pa.string(), 'geopoint': pa.list_(pa.float64())}.get(type)
+
     def restore_descriptor(self, dataframe):
         """Restore descriptor from Pandas
+
+        It also accepts an Arrow schema (e.g. `table.schema`) to restore
+        types from Arrow types without converting any data to Pandas.
+
         """
 
+        # Arrow schema
+        if not isinstance(dataframe, pd.DataFrame):
+            return self.__restore_arrow_descriptor(dataframe)
+
         # Prepare
         fields = []
         primary_key = None
 
         # Primary key
         if dataframe.index.name:
-            field_type = self.restore_type(dataframe.index.dtype)
+            field_type = self.__restore_column_type(dataframe.index)
             field = {
                 'name': dataframe.index.name,
                 'type': field_type,
@@ -142,13 +594,21 @@ class Mapper(object):
             primary_key = dataframe.index.name
 
         # Fields
-        for column, dtype in dataframe.dtypes.iteritems():
-            sample = dataframe[column].iloc[0] if len(dataframe) else None
-            field_type = self.restore_type(dtype, sample=sample)
+        for column in dataframe.columns:
+            values = dataframe[column]
+            field_type = self.__restore_column_type(values)
             field = {'name': column, 'type': field_type}
-            # TODO: provide better required indication
-            # if dataframe[column].isnull().sum() == 0:
-            #     field['constraints'] = {'required': True}
+            constraints = {}
+            if pdc.is_categorical_dtype(values.dtype):
+                constraints['enum'] = values.dtype.categories.tolist()
+            if self.__infer_constraints and len(values):
+                count = values.count()
+                if count == len(values):
+                    constraints['required'] = True
+                if _count_unique(values) == count:
+                    constraints['unique'] = True
+            if constraints:
+                field['constraints'] = constraints
             fields.append(field)
 
         # Descriptor
@@ -181,15 +641,155 @@ class Mapper(object):
                 result.append(field.cast_value(value))
         return result
 
+    def restore_rows(self, dataframe, schema, stats=None):
+        """Restore rows from Pandas column by column
+
+        # Arguments
+            dataframe (pandas.DataFrame): dataframe
+            schema (tableschema.Schema): schema
+            stats (Stats): stats to record restore fallbacks to
+
+        # Returns
+            iterator: rows
+
+        """
+        stats = stats if stats is not None else NullStats()
+        if not len(dataframe):
+            return iter([])
+        columns = []
+        for field in schema.fields:
+            if field.name in schema.primary_key:
+                values = dataframe.index.get_level_values(field.name)
+                columns.append(self.__restore_column(field, values, stats, index=True))
+            else:
+                values = dataframe[field.name]
+                columns.append(self.__restore_column(field, values, stats))
+        stats.rows += len(dataframe)
+        return map(list, zip(*columns))
+
+    def restore_arrow_table(self, dataframe, schema):
+        """Restore Arrow table from Pandas
+
+        Numeric and timestamp columns are passed to Arrow without copying
+        where possible, and categoricals become dictionary arrays.
+
+        # Arguments
+            dataframe (pandas.DataFrame): dataframe
+            schema (tableschema.Schema): schema
+
+        # Returns
+            pyarrow.Table: Arrow table
+
+        """
+        pa = _import_pyarrow()
+        arrays = []
+        for field in schema.fields:
+            if field.name in schema.primary_key:
+                values = dataframe.index.get_level_values(field.name)
+            else:
+                values = dataframe[field.name]
+            arrow_type = self.convert_arrow_type(field.type)
+            if pdc.is_categorical_dtype(values.dtype):
+                array = pa.DictionaryArray.from_pandas(values)
+            elif arrow_type is None or (values.dtype.kind == 'O' and field.type != 'string') or (
+                    values.dtype.kind == 'm' and field.type == 'time'):
+                values = self.__restore_column(field, values, NullStats(), index=True)
+                if field.type in _JSON_TYPES or field.type == 'any':
+                    values = [None if value is None else _dump_json(value) for value in values]
+                elif field.type == 'geopoint':
+                    values = [None if value is None else list(map(float, value))
+                              for value in values]
+                array = pa.array(values, type=arrow_type)
+            else:
+                array = pa.Array.from_pandas(values, type=arrow_type)
+            arrays.append(array)
+        return pa.Table.from_arrays(arrays, names=schema.field_names)
+
+    def format_dataframe(self, dataframe, schema, native=False):
+        """Format dataframe values following Table Schema
+
+        Values are formatted column by column to their Table Schema
+        representation (field formats are respected): dates and times
+        as ISO 8601 strings, booleans as the first of true/false values,
+        durations as ISO 8601 durations and objects, arrays and geojson
+        as JSON strings. Integers with nulls become nullable integers.
+
+        # Arguments
+            dataframe (pandas.DataFrame): dataframe
+            schema (tableschema.Schema): schema
+            native (bool):
+                keep numbers, booleans, objects and arrays as is
+                (e.g. for JSON output)
+
+        # Returns
+            pandas.DataFrame: dataframe with a column per field (and no index)
+
+        """
+        data = collections.OrderedDict()
+        for field in schema.fields:
+            if field.name in schema.primary_key:
+                values = dataframe.index.get_level_values(field.name)
+            else:
+                values = dataframe[field.name]
+            values = pd.Series(values.array, copy=False)
+            data[field.name] = _format_column(field, values, native)
+        return pd.DataFrame(data, columns=list(data), copy=False)
+
+    def format_json_lines(self, dataframe, schema):
+        """Format dataframe rows as JSON lines
+
+        Values are formatted as `mapper.format_dataframe` does it keeping
+        numbers, booleans, objects and arrays native. Every column is encoded
+        to JSON at once (distinct values only once) and the encoded columns
+        are joined into lines, so rows are never restored one by one.
+        Infinite numbers have no JSON representation and are written as nulls.
+
+        # Arguments
+            dataframe (pandas.DataFrame): dataframe
+            schema (tableschema.Schema): schema
+
+        # Returns
+            str: a JSON object per row (every one ending with a newline)
+
+        """
+        dataframe = self.format_dataframe(dataframe, schema, native=True)
+        lines = np.full(len(dataframe), '{', dtype=object)
+        for number, name in enumerate(schema.field_names):
+            values = dataframe[name]
+            nulls = np.asarray(values.isnull())
+            if values.dtype.kind == 'f':
+                nulls |= np.isinf(values.to_numpy(dtype=float, na_value=np.nan))
+            if values.dtype.kind in 'iuf':
+                # Shortest representations (of single precision values too)
+                texts = _object_array(values.astype(str).tolist())
+            elif values.dtype.kind == 'b':
+                texts = _object_array(np.where(values.fillna(False), 'true', 'false'))
+            else:
+                texts = _map_values(values, nulls, _dump_json_value)
+            texts[nulls] = 'null'
+            lines += ('%s:' if not number else ',%s:') % json.dumps(name, ensure_ascii=False)
+            lines += texts
+        return ''.join(line + '}\n' for line in lines)
+
     def restore_type(self, dtype, sample=None):
         """Restore type from Pandas
         """
 
+        # Categorical types
+        if pdc.is_categorical_dtype(dtype):
+            dtype = dtype.categories.dtype
+
         # Pandas types
-        if pdc.is_bool_dtype(dtype):
+        if getattr(dtype, 'name', None) == 'string':
+            return 'string'
+        elif pdc.is_bool_dtype(dtype):
             return 'boolean'
         elif pdc.is_datetime64_any_dtype(dtype):
             return 'datetime'
+        elif pdc.is_timedelta64_dtype(dtype):
+            return 'duration'
+        elif isinstance(dtype, pd.PeriodDtype):
+            return 'yearmonth'
         elif pdc.is_integer_dtype(dtype):
             return 'integer'
         elif pdc.is_numeric_dtype(dtype):
@@ -199,6 +799,14 @@ class Mapper(object):
         if sample is not None:
             if isinstance(sample, (list, tuple)):
                 return 'array'
+            elif isinstance(sample, bool):
+                return 'boolean'
+            elif isinstance(sample, six.integer_types):
+                return 'integer'
+            elif isinstance(sample, (float, decimal.Decimal)):
+                return 'number'
+            elif isinstance(sample, datetime.datetime):
+                return 'datetime'
             elif isinstance(sample, datetime.date):
                 return 'date'
             elif isinstance(sample, isodate.Duration):
@@ -211,3 +819,1143 @@ class Mapper(object):
                 return 'time'
 
         return 'string'
+
+    # Private
+
+    def __restore_column_type(self, values):
+        """Restore type from all (or sampled) column values
+        """
+        dtype = values.dtype
+        if pdc.is_categorical_dtype(dtype):
+            dtype = dtype.categories.dtype
+        if dtype != np.dtype('O'):
+            return self.restore_type(dtype)
+
+        # Python types (a type per kind of non-null values)
+        values = values[values.notnull()]
+        if self.__sample_size is not None:
+            values = values[:self.__sample_size]
+        values = _object_array(values.tolist())
+        codes, kinds = _classify(values)
+        types = set()
+        for code, kind in enumerate(kinds):
+            sample = values[np.argmax(codes == code)]
+            types.add(self.restore_type(dtype, sample=sample))
+
+        # Mixed types
+        if len(types) > 1:
+            if types == set(['integer', 'number']):
+                return 'number'
+            return 'any'
+
+        return types.pop() if types else self.restore_type(dtype)
+
+    def __restore_arrow_descriptor(self, arrow_schema):
+        """Restore descriptor from Arrow schema
+        """
+        pa = _import_pyarrow()
+
+        # Primary key (written by `pyarrow.Table.from_pandas`)
+        primary_key = []
+        pandas_metadata = arrow_schema.pandas_metadata or {}
+        for name in pandas_metadata.get('index_columns', []):
+            if isinstance(name, six.string_types):
+                primary_key.append(name)
+
+        # Fields
+        fields = []
+        for arrow_field in arrow_schema:
+            arrow_type = arrow_field.type
+            if pa.types.is_dictionary(arrow_type):
+                arrow_type = arrow_type.value_type
+            field_type = 'string'
+            for predicate, type in _ARROW_TYPES:
+                if predicate(pa.types)(arrow_type):
+                    field_type = type
+                    break
+            field = {'name': arrow_field.name, 'type': field_type}
+            if arrow_field.name in primary_key:
+                field['constraints'] = {'required': True}
+            fields.append(field)
+        fields.sort(key=lambda field: field['name'] not in primary_key)
+
+        # Descriptor
+        descriptor = {}
+        descriptor['fields'] = fields
+        if len(primary_key) == 1:
+            descriptor['primaryKey'] = primary_key[0]
+        elif primary_key:
+            descriptor['primaryKey'] = primary_key
+
+        return descriptor
+
+    def __cast_column(self, column, values, stats):
+        """Cast column values as a list of (mask, array) parts
+        """
+        parts = []
+        errors = []
+        field = column.plain_field if self.__validate else column.field
+        pending = np.ones(len(values), dtype=bool)
+
+        # Typed values
+        if values.dtype == column.dtype != np.dtype('O') and column.native_cast is not None:
+            stats.count('vectorized_casts', len(values))
+            return [(pending, values)], None
+
+        codes, kinds = _classify(values)
+
+        # Null values
+        nulls = _select(codes, kinds, lambda kind: kind is type(None))
+        floats = _select(codes, kinds, lambda kind: issubclass(kind, float))
+        if floats.any():
+            nulls[floats] = np.isnan(values[floats].astype(np.float64))
+        if nulls.any():
+            pending &= ~nulls
+            array, error = self.__cast_values(field, [None], stats)
+            if error is not None:
+                errors.append((np.flatnonzero(nulls)[0], error[1]))
+            else:
+                parts.append((nulls, array.repeat(nulls.sum())))
+
+        # String values
+        strings = _select(codes, kinds, lambda kind: issubclass(kind, six.string_types))
+        if strings.any():
+            pending &= ~strings
+            handled = None
+            if field.type in _JSON_TYPES:
+                handled, array = self.__decode_json(field, values[strings], stats)
+            elif column.string_cast is not None:
+                handled, array = column.string_cast(field, values[strings])
+                stats.count('vectorized_casts', int(handled.sum()))
+            if handled is not None and handled.any():
+                mask = np.zeros(len(values), dtype=bool)
+                mask[np.flatnonzero(strings)[handled]] = True
+                parts.append((mask, array))
+                strings &= ~mask
+            if strings.any():
+                # Every distinct string is cast only once
+                labels, uniques = pd.factorize(values[strings])
+                stats.count('unique_casts', len(uniques))
+                array, error = self.__cast_values(field, uniques, stats)
+                if error is not None:
+                    index = np.argmax(labels == error[0])
+                    errors.append((np.flatnonzero(strings)[index], error[1]))
+                else:
+                    parts.append((strings, array[labels]))
+
+        # Native values
+        if column.native_cast is not None and pending.any():
+            accept, cast = column.native_cast
+            natives = pending & _select(codes, kinds, accept)
+            if natives.any():
+                try:
+                    parts.append((natives, cast(values[natives])))
+                    stats.count('vectorized_casts', int(natives.sum()))
+                    pending &= ~natives
+                except (TypeError, ValueError, OverflowError):
+                    pass
+
+        # Other values
+        if pending.any():
+            stats.count('cell_casts', int(pending.sum()))
+            array, error = self.__cast_values(field, values[pending], stats)
+            if error is not None:
+                errors.append((np.flatnonzero(pending)[error[0]], error[1]))
+            else:
+                parts.append((pending, array))
+
+        # Temporal values (cast to Python objects by other casts)
+        if column.temporal is not None and not errors:
+            parts, error = self.__convert_temporal(column, parts)
+            if error is not None:
+                errors.append(error)
+
+        return parts, min(errors, key=lambda error: error[0]) if errors else None
+
+    def __decode_json(self, field, strings, stats):
+        """Decode distinct JSON strings once sharing decoded values between rows
+        """
+        labels, uniques = pd.factorize(strings)
+        result = np.empty(len(uniques), dtype=object)
+        decoded = np.zeros(len(uniques), dtype=bool)
+        keys = [(field.type, field.format, string) for string in uniques]
+
+        # Values decoded by previous batches
+        with self.__interned_lock:
+            for position, key in enumerate(keys):
+                value = self.__interned.pop(key, _MISSING)
+                if value is not _MISSING:
+                    self.__interned[key] = value
+                    result[position] = value
+                    decoded[position] = True
+        stats.count('json_interned', int(decoded.sum()))
+
+        # Other values (missing values and strings failed to be decoded are cast
+        # one by one later so their errors and fallbacks stay as they are)
+        interned = []
+        missing_values = set(field.missing_values)
+        for position in np.flatnonzero(~decoded):
+            string = uniques[position]
+            if string in missing_values:
+                continue
+            try:
+                value = field.cast_value(_decode_json(string), constraints=False)
+            except (ValueError, StopIteration, tableschema.exceptions.CastError):
+                continue
+            result[position] = value
+            decoded[position] = True
+            interned.append((keys[position], value))
+        stats.count('json_decodes', len(interned))
+        if self.__intern_size:
+            with self.__interned_lock:
+                self.__interned.update(interned)
+                while len(self.__interned) > self.__intern_size:
+                    self.__interned.popitem(last=False)
+
+        # Constraints (other than required and unique) are checked per distinct value
+        if not _is_plain(field):
+            for position in np.flatnonzero(decoded):
+                try:
+                    field.cast_value(result[position])
+                except tableschema.exceptions.CastError:
+                    decoded[position] = False
+
+        handled = decoded[labels]
+        return handled, result[labels[handled]]
+
+    def __convert_temporal(self, column, parts):
+        """Convert cast parts to the native temporal dtype of column
+        """
+        result = []
+        temporal = column.temporal
+        for mask, array in parts:
+            if array.dtype != temporal.dtype:
+                try:
+                    array = temporal.convert(array)
+                except (TypeError, ValueError, OverflowError):
+                    # Find the first value out of native bounds
+                    for index, value in enumerate(array):
+                        try:
+                            temporal.convert(_object_array([value]))
+                        except (TypeError, ValueError, OverflowError) as exception:
+                            message = 'Field "%s" can\'t store value "%s" natively: %s'
+                            message = message % (column.name, value, exception)
+                            error = tableschema.exceptions.CastError(message)
+                            return None, (np.flatnonzero(mask)[index], error)
+            result.append((mask, array))
+        return result, None
+
+    def __convert_arrow_temporal(self, column, chunked_array):
+        """Convert Arrow column to the native temporal dtype of column
+        """
+        array = chunked_array.to_pandas()
+        if pdc.is_datetime64tz_dtype(array.dtype):
+            array = array.dt.tz_convert(None)
+        if array.dtype == column.temporal.dtype:
+            parts = [(np.ones(len(array), dtype=bool), array.values)]
+        else:
+            # Other columns (e.g. dates, times or strings) are cast the way rows are
+            values = _object_array(chunked_array.to_pylist())
+            parts, error = self.__cast_column(column, values, NullStats())
+            if error is not None:
+                raise error[1]
+        return _merge_temporal_parts(column, parts, len(array))
+
+    def __convert_categorical(self, field, array):
+        """Convert string column to categorical if it's worth it
+        """
+        enum = field.constraints.get('enum')
+        if enum is not None:
+            categorical = pd.Categorical(array, categories=enum)
+            if self.__validate:
+                # Values outside of the enum are kept to be reported by validation
+                others = pd.isnull(categorical) & ~pd.isnull(array)
+                if others.any():
+                    categories = pd.Index(enum).append(pd.Index(pd.unique(array[others])))
+                    categorical = pd.Categorical(array, categories=categories)
+            return categorical
+        if self.__categorical_threshold is not None and len(array):
+            ratio = pd.Series(array).nunique() / len(array)
+            if ratio < self.__categorical_threshold:
+                return pd.Categorical(array)
+        return array
+
+    def __convert_compact(self, column, array):
+        """Convert numeric column to a compact dtype if it's enabled
+        """
+        if type(array) is getattr(pd.arrays, 'PandasArray', None):
+            array = array.to_numpy()
+        dtype = array.dtype
+        if dtype.kind == 'f' and column.field.type == 'number':
+            if self.__compact_floats and dtype.itemsize > 4:
+                return array.astype(np.float32)
+            return array
+        if not self.__compact or dtype.kind not in 'iu' or not len(array):
+            return array
+        values = array[~pd.isnull(array)] if _is_extension(dtype) else array
+        if not len(values):
+            return array
+        minimum, maximum = int(values.min()), int(values.max())
+        compact_dtype = column.compact_dtype
+        # Values out of declared ranges (left to validation) must not wrap around
+        if compact_dtype is None or not _fits_dtype(compact_dtype, minimum, maximum):
+            compact_dtype = _get_compact_dtype(minimum, maximum)
+        if compact_dtype.itemsize >= dtype.itemsize:
+            return array
+        if _is_extension(dtype):
+            prefix = 'UInt' if compact_dtype.kind == 'u' else 'Int'
+            compact_dtype = pd.api.types.pandas_dtype(prefix + str(compact_dtype.itemsize * 8))
+        return array.astype(compact_dtype)
+
+    def __create_index(self, plan, casts, size):
+        """Create index from cast primary key columns
+        """
+        arrays = []
+        for column in plan.index_columns:
+            arrays.append(_merge_typed_parts(column, casts[column.name], size))
+        if len(plan.index_columns) == 1:
+            column = plan.index_columns[0]
+            if column.temporal is not None:
+                return pd.Index(arrays[0], name=column.name)
+            if self.__validate and column.dtype.kind in 'iub' and pd.isnull(arrays[0]).any():
+                # Null keys of validated rows are kept to be reported
+                return pd.Index(arrays[0], name=column.name, dtype=object)
+            return pd.Index(arrays[0], name=column.name, dtype=column.dtype)
+        return pd.MultiIndex.from_arrays(arrays, names=plan.schema.primary_key)
+
+    def __raise_row_error(self, plan, casts, dtypes, size):
+        """Raise an error of the first row failed to fit column dtypes
+        """
+        arrays = []
+        structure = []
+        for column in plan.data_columns:
+            if column.temporal is not None:
+                continue
+            array = _merge_parts(casts[column.name], size, np.dtype('O'), numeric=column.numeric)
+            column_name = column.name
+            if six.PY2:
+                column_name = column.name.encode('utf-8')
+            arrays.append(array)
+            structure.append((column_name, dtypes[column.name]))
+        np.array(list(zip(*arrays)), dtype=structure)
+
+    def __restore_column(self, field, values, stats, index=False):
+        """Restore column values as a list of Python values
+        """
+        kind = values.dtype.kind
+        plain = _is_plain(field)
+        if plain and field.required and values.isnull().any():
+            plain = False
+
+        # Native temporal
+        temporal = _TEMPORALS.get(field.type)
+        if temporal is not None and str(values.dtype) == temporal.pandas_dtype:
+            nulls = np.asarray(values.isnull())
+            values = _map_values(values, nulls, functools.partial(temporal.restore, field))
+            return self.__check_values(field, values.tolist(), plain, stats)
+
+        # Nullable
+        if _is_extension(values.dtype):
+            values = values.to_numpy(dtype=object, na_value=None).tolist()
+            return self.__check_values(field, values, plain, stats)
+
+        # Number
+        if field.type == 'number' and kind in 'fiu':
+            compact = values.dtype == np.float32
+            array = np.asarray(values, dtype=np.float32 if compact else np.float64)
+            nulls = np.isnan(array)
+            # Compact floats are formatted as float32 not to restore 0.1 as 0.100000001
+            if compact:
+                strings = array[~nulls].astype(str)
+            else:
+                strings = map(str, array[~nulls].tolist())
+            result = _object_array(list(map(decimal.Decimal, strings)))
+            if nulls.any():
+                result = _expand(result, ~nulls)
+            values = result.tolist()
+            return self.__check_values(field, values, plain, stats)
+
+        # Integer
+        if field.type == 'integer' and kind in 'fiu':
+            if kind == 'f':
+                array = np.asarray(values)
+                nulls = np.isnan(array)
+                values = _expand(_object_array(array[~nulls].astype(np.int64).tolist()), ~nulls)
+            values = values.tolist()
+            return self.__check_values(field, values, plain, stats)
+
+        # Datetime
+        if field.type == 'datetime' and kind == 'M':
+            if index:
+                values = values.tolist()
+            else:
+                values = values.dt.to_pydatetime().tolist()
+            return self.__check_values(field, values, plain, stats)
+
+        # Boolean
+        if field.type == 'boolean' and kind == 'b':
+            values = values.tolist()
+            return self.__check_values(field, values, plain, stats)
+
+        # Others
+        stats.count('cell_restores', len(values))
+        values = [self.__restore_value(field, value, index=index) for value in values.tolist()]
+        if field.type in _JSON_TYPES:
+            # Decoded values shared by rows (or interned across buckets) are copied
+            values = _unshare_values(values, every=bool(self.__intern_size))
+        return values
+
+    def __check_values(self, field, values, plain, stats):
+        """Cast restored values if field constraints have to be checked
+        """
+        if plain:
+            stats.count('vectorized_restores', len(values))
+            return values
+        stats.count('cell_restores', len(values))
+        return list(map(field.cast_value, values))
+
+    def __restore_value(self, field, value, index=False):
+        """Restore a single value the way a column restore falls back to
+        """
+        if field.type == 'number' and isinstance(value, float) and np.isnan(value):
+            value = None
+        if value and field.type == 'integer':
+            value = int(value)
+        elif field.type == 'datetime' and not index and isinstance(value, pd.Timestamp):
+            value = value.to_pydatetime()
+        elif isinstance(value, pd.Timedelta):
+            value = value.to_pytimedelta()
+        return field.cast_value(value)
+
+    def __check_constraint(self, column, name, values, nulls):
+        """Return a mask of non-null values failing a field constraint
+        """
+        failed = np.zeros(len(values), dtype=bool)
+        values = values[~nulls]
+        if not len(values):
+            return failed
+        result = _check_array(column.field, name, values)
+        if result is None:
+            # Other values are restored and checked once per distinct value
+            labels, uniques = _factorize(values.array)
+            uniques = self.__restore_column(column.plain_field, pd.Series(uniques), NullStats())
+            result = np.array([not column.field.test_value(value, constraints=[name])
+                               for value in uniques], dtype=bool)[labels]
+        failed[~nulls] = result
+        return failed
+
+    def __cast_values(self, field, values, stats):
+        """Cast values one by one stopping at the first error
+        """
+        result = []
+        for index, value in enumerate(values):
+            try:
+                result.append(self.__cast_value(field, value, stats))
+            except Exception as exception:
+                return None, (index, exception)
+        return _object_array(result), None
+
+    def __cast_value(self, field, value, stats):
+        """Cast a single value the way a column cast falls back to
+        """
+        try:
+            if isinstance(value, float) and np.isnan(value):
+                value = None
+            if value and field.type == 'integer':
+                value = int(value)
+            value = field.cast_value(value)
+        except tableschema.exceptions.CastError:
+            stats.count('json_fallbacks')
+            value = json.loads(value)
+        return value
+
+
+# Internal
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        message = 'Arrow interchange requires "pyarrow" package to be installed'
+        raise tableschema.exceptions.StorageError(message)
+    return pyarrow
+
+
+_Plan = collections.namedtuple('_Plan', [
+    'schema', 'columns', 'index_columns', 'data_columns'])
+
+_Column = collections.namedtuple('_Column', [
+    'name', 'field', 'plain_field', 'position', 'primary', 'numeric',
+    'dtype', 'null_dtype', 'compact_dtype', 'string_cast', 'native_cast', 'temporal'])
+
+_Temporal = collections.namedtuple('_Temporal', [
+    'pandas_dtype', 'dtype', 'string_cast', 'convert', 'wrap', 'restore'])
+
+
+def _is_plain(field):
+    # Constraints checked by `field.cast_value` but satisfied by any non-null value
+    return not set(field.constraints) - set(['required', 'unique'])
+
+
+def _get_plain_field(field):
+    # Field casting values without checking constraints
+    if not field.constraints:
+        return field
+    descriptor = dict(field.descriptor, constraints={})
+    return tableschema.Field(descriptor, missing_values=field.missing_values)
+
+
+def _get_constraints_dtype(field):
+    # Declared ranges give dtypes which don't depend on written values
+    minimum = field.constraints.get('minimum')
+    maximum = field.constraints.get('maximum')
+    if field.type not in ('integer', 'year') or minimum is None or maximum is None:
+        return None
+    try:
+        return _get_compact_dtype(int(minimum), int(maximum))
+    except (TypeError, ValueError):
+        return None
+
+
+def _fits_dtype(dtype, minimum, maximum):
+    info = np.iinfo(dtype)
+    return info.min <= minimum and maximum <= info.max
+
+
+def _get_compact_dtype(minimum, maximum):
+    # 64 bit dtypes are never mixed up so concatenation upcasts without floats
+    dtypes = _UNSIGNED_DTYPES if minimum >= 0 else _SIGNED_DTYPES
+    for dtype in dtypes:
+        if _fits_dtype(dtype, minimum, maximum):
+            return dtype
+    return np.dtype(np.int64)
+
+
+def _format_column(field, values, native):
+    nulls = np.asarray(values.isnull())
+    if field.type in ('integer', 'year') and values.dtype.kind == 'f':
+        return values.astype('Int64')
+    if field.type in ('integer', 'number', 'year', 'string') and values.dtype.kind != 'O':
+        return values
+
+    # Booleans
+    if field.type == 'boolean':
+        if native:
+            return values
+        true_value = field.descriptor.get('trueValues', ['true'])[0]
+        false_value = field.descriptor.get('falseValues', ['false'])[0]
+        result = _object_array(np.where(values.fillna(False).astype(bool), true_value, false_value))
+        result[nulls] = None
+        return result
+
+    # Dates and times
+    if field.type in _FORMAT_PATTERNS:
+        pattern = _get_pattern(field) or _FORMAT_PATTERNS[field.type]
+        if values.dtype.kind == 'm':
+            values = pd.Series(_map_values(values, nulls, functools.partial(_restore_time, field)))
+        if values.dtype.kind == 'M':
+            return values.dt.strftime(pattern)
+        if field.type == 'time' and pattern == _FORMAT_PATTERNS['time']:
+            return _map_values(values, nulls, lambda value: value.isoformat())
+        return _map_values(values, nulls, lambda value: value.strftime(pattern))
+
+    # Other types
+    if field.type == 'duration':
+        if values.dtype.kind == 'm':
+            values = values.astype(object)
+        return _map_values(values, nulls, isodate.duration_isoformat)
+    if field.type == 'yearmonth':
+        if isinstance(values.dtype, pd.PeriodDtype):
+            return _map_values(values, nulls, lambda value: '%04d-%02d' % (value.year, value.month))
+        return _map_values(values, nulls, lambda value: '%04d-%02d' % tuple(value))
+    if field.type == 'geopoint':
+        if field.format == 'object':
+            function = _format_geopoint_object
+        elif field.format == 'array':
+            function = _format_geopoint_array
+        else:
+            return _map_values(values, nulls, lambda value: '%s,%s' % tuple(value))
+        if not native:
+            function = _compose(json.dumps, function)
+        return _map_values(values, nulls, function)
+    if field.type in ('object', 'array', 'geojson', 'any') and not native:
+        return _map_values(values, nulls, _dump_json)
+    return values
+
+
+def _format_geopoint_object(value):
+    return {'lon': float(value[0]), 'lat': float(value[1])}
+
+
+def _format_geopoint_array(value):
+    return [float(value[0]), float(value[1])]
+
+
+def _map_values(values, nulls, function):
+    # Distinct values (if hashable) are mapped only once
+    result = np.full(len(values), None, dtype=object)
+    labels, uniques = _factorize(values.array[~nulls])
+    result[~nulls] = _object_array(list(map(function, uniques)))[labels]
+    return result
+
+
+def _factorize(values):
+    try:
+        labels = pd.factorize(values)[0]
+    except TypeError:
+        # Unhashable values (e.g. decoded JSON shared by rows) are told apart by ids
+        ids = np.fromiter(map(id, np.asarray(values)), dtype=np.intp, count=len(values))
+        labels = pd.factorize(ids)[0]
+    # Uniques are taken from values to keep their scalar types (e.g. timestamps)
+    return labels, values[np.unique(labels, return_index=True)[1]]
+
+
+def _get_column_values(dataframes, column):
+    # Values of a field in dataframes (primary key fields are index levels)
+    parts = []
+    for dataframe in dataframes:
+        if column.primary:
+            parts.append(pd.Series(dataframe.index.get_level_values(column.name)))
+        else:
+            parts.append(dataframe[column.name].reset_index(drop=True))
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True)
+
+
+def _check_array(field, name, values):
+    # Mask of non-null values failing a constraint (None if arrays can't check it)
+    kind = values.dtype.kind
+    constraint = field.constraints[name]
+    convert = None
+    if field.type in ('integer', 'number', 'year') and kind in 'iuf':
+        convert = float if field.type == 'number' else int
+    elif field.type in ('date', 'datetime') and kind == 'M':
+        convert = functools.partial(_get_timestamp, tz=getattr(values.dtype, 'tz', None))
+    elif field.type == 'string' and kind == 'O':
+        if name in ('minLength', 'maxLength', 'pattern'):
+            # Distinct strings are checked only once
+            labels, uniques = pd.factorize(values)
+            uniques = pd.Series(uniques, dtype=object)
+            if name == 'minLength':
+                result = uniques.str.len() < constraint
+            elif name == 'maxLength':
+                result = uniques.str.len() > constraint
+            else:
+                # The way `tableschema` matches patterns
+                result = ~uniques.str.match('^{0}$'.format(constraint)).astype(bool)
+            return np.asarray(result, dtype=bool)[labels]
+        if name == 'enum':
+            convert = six.text_type
+    if convert is None or name not in ('minimum', 'maximum', 'enum'):
+        return None
+    cast = _compose(convert, functools.partial(field.cast_value, constraints=False))
+    if kind == 'f':
+        # Compacted floats are compared with constraints of their precision
+        cast = _compose(values.dtype.type, cast)
+    try:
+        if name == 'minimum':
+            return np.asarray(values < cast(constraint), dtype=bool)
+        if name == 'maximum':
+            return np.asarray(values > cast(constraint), dtype=bool)
+        return ~np.asarray(values.isin(list(map(cast, constraint))), dtype=bool)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _get_timestamp(value, tz=None):
+    # Datetimes without a time zone are UTC ones (the way they are cast)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None and tz is not None:
+        return timestamp.tz_localize(tz)
+    if timestamp.tzinfo is not None and tz is None:
+        return timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
+
+def _find_duplicates(values, nulls, previous):
+    # Mask of non-null values equal to values of previous rows or series
+    keys = [series[~np.asarray(series.isnull())] for series in previous] + [values[~nulls]]
+    keys = pd.concat(keys, ignore_index=True) if previous else keys[0]
+    try:
+        duplicated = keys.duplicated().values
+    except TypeError:
+        # Unhashable values (objects and arrays) are compared as JSON
+        dump = functools.partial(json.dumps, sort_keys=True, default=_json_default)
+        duplicated = keys.map(dump).duplicated().values
+    failed = np.zeros(len(values), dtype=bool)
+    failed[~nulls] = duplicated[len(duplicated) - len(values) + int(nulls.sum()):]
+    return failed
+
+
+def _find_duplicate_keys(indexes, previous):
+    # Mask of keys having nulls or equal to keys of previous rows or indexes
+    index = indexes[0].append(indexes[1:]) if len(indexes) > 1 else indexes[0]
+    nulls = np.zeros(len(index), dtype=bool)
+    for level in range(index.nlevels):
+        nulls |= np.asarray(pd.isnull(index.get_level_values(level)))
+    keys = index[~nulls]
+    if previous:
+        keys = previous[0].append(previous[1:] + [keys])
+    failed = nulls.copy()
+    failed[~nulls] = keys.duplicated()[len(keys) - int((~nulls).sum()):]
+    return failed
+
+
+def _unshare_values(values, every=False):
+    # A shared value is pickled once and every row gets its own unpickled copy
+    counts = collections.Counter(map(id, values))
+    pickled = {}
+    result = []
+    for value in values:
+        if isinstance(value, (dict, list)) and (every or counts[id(value)] > 1):
+            key = id(value)
+            if key not in pickled:
+                pickled[key] = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            value = pickle.loads(pickled[key])
+        result.append(value)
+    return result
+
+
+def _compose(outer, inner):
+    return lambda value: outer(inner(value))
+
+
+def _dump_json(value):
+    if isinstance(value, six.string_types):
+        return value
+    return _dump_json_value(value)
+
+
+def _dump_json_value(value):
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _count_unique(values):
+    try:
+        return values.nunique()
+    except TypeError:
+        return None
+
+
+def _transpose_rows(rows, width):
+    rows = list(rows)
+    widths = set(map(len, rows))
+    if widths and min(widths) < width:
+        message = 'Row has %s values but schema has %s fields' % (min(widths), width)
+        raise ValueError(message)
+    return [_object_array(list(map(operator.itemgetter(index), rows)))
+            for index in range(width)]
+
+
+def _object_array(values):
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _classify(values):
+    # Types are factorized by ids as numpy is slow on arrays of type objects
+    kinds = dict((id(kind), kind) for kind in set(map(type, values)))
+    ids = np.fromiter(map(id, map(type, values)), dtype=np.intp, count=len(values))
+    codes, uniques = pd.factorize(ids)
+    return codes, [kinds[ident] for ident in uniques]
+
+
+def _select(codes, kinds, predicate):
+    selected = np.array([bool(predicate(kind)) for kind in kinds], dtype=bool)
+    return selected[codes]
+
+
+def _expand(array, mask):
+    result = np.empty(len(mask), dtype=object)
+    result[mask] = array
+    return result
+
+
+def _is_extension(dtype):
+    return isinstance(dtype, pd.api.extensions.ExtensionDtype)
+
+
+def _has_nulls(array):
+    if array.dtype.kind in 'fOMm':
+        return bool(pd.isnull(array).any())
+    return False
+
+
+def _merge_parts(parts, size, dtype, numeric=False):
+    if _is_extension(dtype):
+        result = _merge_parts(parts, size, np.dtype('O'))
+        return pd.array(result, dtype=dtype)
+    if len(parts) == 1 and parts[0][1].dtype == dtype and not numeric:
+        return parts[0][1]
+    result = np.empty(size, dtype=dtype)
+    for mask, array in parts:
+        if numeric and array.dtype == object:
+            array = np.where(pd.isnull(array), np.NaN, array)
+        elif dtype.kind == 'O' and array.dtype.kind == 'M':
+            array = array.astype('datetime64[us]').astype(object)
+        elif dtype.kind == 'O' and array.dtype.kind == 'm':
+            array = array.astype('timedelta64[us]').astype(object)
+        result[mask] = array
+    return result
+
+
+def _merge_typed_parts(column, parts, size):
+    # Values are merged to their dtypes if it's lossless or go through objects
+    kind = getattr(column.dtype, 'kind', None)
+    if column.temporal is not None:
+        return _merge_temporal_parts(column, parts, size)
+    if kind in ('f', 'M') or (
+            kind in ('i', 'u') and not any(_has_nulls(array) for mask, array in parts)):
+        try:
+            return _merge_parts(parts, size, column.dtype, numeric=column.numeric)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _merge_parts(parts, size, np.dtype('O'), numeric=column.numeric)
+
+
+def _cast_integer_strings(field, strings):
+    # Non-empty strings go through `int` before casting so only '' can be missing
+    return _cast_numeric_strings(strings, np.int64, missing_values=[''])
+
+
+def _cast_number_strings(field, strings):
+    for key in ['decimalChar', 'groupChar', 'bareNumber']:
+        if key in field.descriptor:
+            return np.zeros(len(strings), dtype=bool), None
+    return _cast_numeric_strings(strings, np.float64, missing_values=field.missing_values)
+
+
+def _cast_numeric_strings(strings, dtype, missing_values):
+    handled = ~np.isin(strings, missing_values)
+    for attempt in range(2):
+        try:
+            return handled, strings[handled].astype(dtype)
+        except (ValueError, OverflowError):
+            if attempt:
+                break
+            handled &= ~pd.isnull(pd.to_numeric(strings, errors='coerce'))
+    return np.zeros(len(strings), dtype=bool), None
+
+
+def _cast_datetime_strings(field, strings):
+    parse_exact = _parse_iso_datetimes if field.format == 'default' else None
+    return _cast_pattern_strings(strings, _get_pattern(field), parse_exact)
+
+
+def _cast_date_strings(field, strings):
+    parse_exact = _parse_iso_dates if field.format == 'default' else None
+    handled, result = _cast_pattern_strings(strings, _get_pattern(field), parse_exact)
+    # Patterns may have times which dates drop
+    return handled, result.astype('datetime64[D]').astype('datetime64[ns]')
+
+
+def _cast_time_strings(field, strings):
+    parse_exact = _parse_iso_times if field.format == 'default' else None
+    handled, result = _cast_pattern_strings(strings, _get_pattern(field), parse_exact)
+    # Times are parsed as datetimes and stored as time since midnight
+    return handled, result - result.astype('datetime64[D]')
+
+
+def _cast_duration_strings(field, strings):
+    # Durations having only days, hours, minutes and integer seconds are timedeltas
+    # (every distinct string is parsed only once)
+    labels, uniques = pd.factorize(strings)
+    seconds = np.array(list(map(_get_duration_seconds, uniques)), dtype=np.int64)[labels]
+    handled = (seconds >= 0) & (seconds < _MAX_SECONDS)
+    return handled, (seconds[handled] * 10 ** 9).view('timedelta64[ns]')
+
+
+def _cast_yearmonth_strings(field, strings):
+    # Strings exactly like "2000-01" become ordinals of monthly periods
+    matched, codes = _match_digits(strings, 7, [0, 1, 2, 3, 5, 6], [(4, '-')])
+    years = _read_number(codes, 0, 4)
+    months = _read_number(codes, 5, 7)
+    matched &= (months >= 1) & (months <= 12)
+    return matched, ((years - 1970) * 12 + months - 1)[matched]
+
+
+def _cast_pattern_strings(strings, pattern, parse_exact=None):
+    # Strings parsed by pandas are taken only if they are formatted back the same way
+    # (so pandas leniencies don't let strings strptime fails on go through)
+    handled = np.zeros(len(strings), dtype=bool)
+    result = np.full(len(strings), np.datetime64('NaT'), dtype='datetime64[ns]')
+    if pattern is None or '%z' in pattern or '%Z' in pattern:
+        return handled, result[handled]
+    if parse_exact is not None:
+        handled, array = parse_exact(strings)
+        result[handled] = array
+    others = ~handled
+    if others.any():
+        strings = strings[others]
+        try:
+            array = pd.to_datetime(strings, format=pattern, errors='coerce')
+        except (TypeError, ValueError):
+            return handled, result[handled]
+        parsed = ~pd.isnull(array)
+        formatted = np.asarray(array[parsed].strftime(pattern), dtype=object)
+        parsed[parsed] = formatted == strings[parsed]
+        result[others] = np.asarray(array)
+        handled[others] = parsed
+    return handled, result[handled]
+
+
+def _parse_iso_datetimes(strings):
+    # Strings exactly like "2000-01-01T00:00:00Z" are parsed by numpy much faster
+    # (it fails on invalid dates so out of bounds years are left to strptime)
+    matched, codes = _match_digits(strings, 20, _ISO_DIGITS, _ISO_SEPARATORS)
+    matched &= _is_in_bounds(_read_number(codes, 0, 4))
+    try:
+        return matched, strings[matched].astype('U19').astype('datetime64[ns]')
+    except ValueError:
+        return np.zeros(len(strings), dtype=bool), np.zeros(0, dtype='datetime64[ns]')
+
+
+def _parse_iso_dates(strings):
+    matched, codes = _match_digits(strings, 10, _ISO_DIGITS[:8], _ISO_SEPARATORS[:2])
+    matched &= _is_in_bounds(_read_number(codes, 0, 4))
+    try:
+        return matched, strings[matched].astype('U10').astype('datetime64[D]')
+    except ValueError:
+        return np.zeros(len(strings), dtype=bool), np.zeros(0, dtype='datetime64[ns]')
+
+
+def _parse_iso_times(strings):
+    matched, codes = _match_digits(strings, 8, [0, 1, 3, 4, 6, 7], [(2, ':'), (5, ':')])
+    hours = _read_number(codes, 0, 2)
+    minutes = _read_number(codes, 3, 5)
+    seconds = _read_number(codes, 6, 8)
+    matched &= (hours < 24) & (minutes < 60) & (seconds < 60)
+    seconds = (hours * 60 + minutes) * 60 + seconds
+    return matched, (seconds[matched] * 10 ** 9).view('datetime64[ns]')
+
+
+def _match_digits(strings, width, digits, separators):
+    # Codes of characters are matched (and read) for all strings at once
+    codes = strings.astype('U%s' % (width + 1)).view(np.uint32).reshape(len(strings), width + 1)
+    matched = ((codes[:, digits] >= ord('0')) & (codes[:, digits] <= ord('9'))).all(axis=1)
+    matched &= codes[:, width] == 0
+    for position, char in separators:
+        matched &= codes[:, position] == ord(char)
+    return matched, codes
+
+
+def _read_number(codes, start, stop):
+    digits = codes[:, start:stop].astype(np.int64) - ord('0')
+    return digits.dot(10 ** np.arange(stop - start)[::-1])
+
+
+def _is_in_bounds(years):
+    # Years of nanosecond datetimes (partially covered ones are left out)
+    return (years > 1677) & (years < 2262)
+
+
+def _get_pattern(field):
+    # Format patterns of dates and times ("any" format has no pattern)
+    if field.format in ('default', None):
+        return _FORMAT_PATTERNS[field.type]
+    if field.format == 'any':
+        return None
+    return field.format[4:] if field.format.startswith('fmt:') else field.format
+
+
+def _decode_json(string):
+    # The C scanner of json skips checks of `json.loads` (it raises StopIteration
+    # if there is no value, e.g. on leading whitespaces)
+    value, end = _JSON_SCANNER(string, 0)
+    if end != len(string):
+        raise ValueError('Extra data')
+    return value
+
+
+def _convert_temporals(values, function):
+    # Distinct values are converted to integers only once (nulls become NaT)
+    labels, uniques = pd.factorize(values)
+    try:
+        integers = np.array(list(map(function, uniques)) + [_NAT], dtype=np.int64)
+    except OverflowError:
+        raise ValueError('it is out of bounds')
+    return integers[labels]
+
+
+def _convert_dates(values):
+    return _convert_temporals(values, _get_date_nanoseconds).view('datetime64[ns]')
+
+
+def _convert_datetimes(values):
+    # Datetimes with time zones are converted to UTC
+    return np.asarray(pd.to_datetime(values, utc=True).tz_convert(None))
+
+
+def _convert_durations(values):
+    # Durations having years or months can't be timedeltas so they stay objects
+    if any(isinstance(value, isodate.Duration) for value in values):
+        return values
+    return _convert_temporals(values, _get_duration_nanoseconds).view('timedelta64[ns]')
+
+
+def _convert_times(values):
+    return _convert_temporals(values, _get_time_nanoseconds).view('timedelta64[ns]')
+
+
+def _convert_yearmonths(values):
+    return _convert_temporals(values, lambda value: (value[0] - 1970) * 12 + value[1] - 1)
+
+
+def _get_duration_seconds(string):
+    match = _DURATION_PATTERN.match(string)
+    if match is None or string[-1] in 'PT':
+        return -1
+    numbers = match.groups()
+    return sum(int(number) * unit for number, unit in zip(numbers, _DURATION_UNITS) if number)
+
+
+def _get_date_nanoseconds(value):
+    return (value.toordinal() - _EPOCH_ORDINAL) * 86400 * 10 ** 9
+
+
+def _get_duration_nanoseconds(value):
+    return value // datetime.timedelta(microseconds=1) * 1000
+
+
+def _get_time_nanoseconds(value):
+    if value.tzinfo is not None:
+        raise ValueError('times with time zones are not supported')
+    seconds = (value.hour * 60 + value.minute) * 60 + value.second
+    return (seconds * 10 ** 6 + value.microsecond) * 1000
+
+
+def _restore_time(field, value):
+    return (datetime.datetime.min + value.to_pytimedelta()).time()
+
+
+def _merge_temporal_parts(column, parts, size):
+    # Parts of durations kept as objects make the whole column objects
+    temporal = column.temporal
+    if any(array.dtype != temporal.dtype for mask, array in parts):
+        return _merge_parts(parts, size, np.dtype('O'))
+    return temporal.wrap(_merge_parts(parts, size, temporal.dtype))
+
+
+def _cast_plain_strings(field, strings):
+    if field.type == 'string' and field.format not in ('default', None):
+        return np.zeros(len(strings), dtype=bool), None
+    handled = ~pd.Series(strings).isin(field.missing_values).values
+    return handled, strings[handled]
+
+
+_FORMAT_PATTERNS = {
+    'date': '%Y-%m-%d',
+    'datetime': '%Y-%m-%dT%H:%M:%SZ',
+    'time': '%H:%M:%S',
+}
+
+_ISO_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_ISO_SEPARATORS = [(4, '-'), (7, '-'), (10, 'T'), (13, ':'), (16, ':'), (19, 'Z')]
+
+_DURATION_PATTERN = re.compile(
+    r'P(?:(\d{1,9})D)?(?:T(?:(\d{1,9})H)?(?:(\d{1,9})M)?(?:(\d{1,9})S)?)?\Z')
+
+_DURATION_UNITS = [86400, 3600, 60, 1]
+
+_MAX_SECONDS = 9 * 10 ** 9
+
+_JSON_TYPES = ['object', 'array', 'geojson']
+
+_CONSTRAINTS = [
+    'required', 'unique', 'minLength', 'maxLength', 'minimum', 'maximum', 'pattern', 'enum']
+
+_JSON_SCANNER = json.scanner.make_scanner(json.JSONDecoder())
+
+_MISSING = object()
+
+_NAT = np.iinfo(np.int64).min
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+_ARROW_TYPES = [
+    (lambda types: types.is_boolean, 'boolean'),
+    (lambda types: types.is_integer, 'integer'),
+    (lambda types: types.is_floating, 'number'),
+    (lambda types: types.is_decimal, 'number'),
+    (lambda types: types.is_timestamp, 'datetime'),
+    (lambda types: types.is_date, 'date'),
+    (lambda types: types.is_time, 'time'),
+    (lambda types: types.is_duration, 'duration'),
+    (lambda types: types.is_list, 'array'),
+    (lambda types: types.is_struct, 'object'),
+    (lambda types: types.is_map, 'object'),
+]
+
+_SIGNED_DTYPES = [np.dtype(np.int8), np.dtype(np.int16), np.dtype(np.int32)]
+_UNSIGNED_DTYPES = [np.dtype(np.uint8), np.dtype(np.uint16), np.dtype(np.uint32)]
+
+_NULLABLE_DTYPES = {
+    'boolean': 'boolean',
+    'integer': 'Int64',
+    'string': 'string',
+}
+
+_STRING_CASTS = {
+    'any': _cast_plain_strings,
+    'datetime': _cast_datetime_strings,
+    'integer': _cast_integer_strings,
+    'number': _cast_number_strings,
+    'string': _cast_plain_strings,
+}
+
+_TEMPORALS = {
+    'date': _Temporal(
+        pandas_dtype='datetime64[ns]',
+        dtype=np.dtype('datetime64[ns]'),
+        string_cast=_cast_date_strings,
+        convert=_convert_dates,
+        wrap=lambda array: array,
+        restore=lambda field, value: value.date()),
+    'datetime': _Temporal(
+        pandas_dtype='datetime64[ns, UTC]',
+        dtype=np.dtype('datetime64[ns]'),
+        string_cast=_cast_datetime_strings,
+        convert=_convert_datetimes,
+        wrap=lambda array: pd.DatetimeIndex(array).tz_localize('UTC').array,
+        restore=lambda field, value: value.to_pydatetime()),
+    'duration': _Temporal(
+        pandas_dtype='timedelta64[ns]',
+        dtype=np.dtype('timedelta64[ns]'),
+        string_cast=_cast_duration_strings,
+        convert=_convert_durations,
+        wrap=lambda array: array,
+        restore=lambda field, value: value.to_pytimedelta()),
+    'time': _Temporal(
+        pandas_dtype='timedelta64[ns]',
+        dtype=np.dtype('timedelta64[ns]'),
+        string_cast=_cast_time_strings,
+        convert=_convert_times,
+        wrap=lambda array: array,
+        restore=_restore_time),
+    'yearmonth': _Temporal(
+        pandas_dtype='period[M]',
+        dtype=np.dtype(np.int64),
+        string_cast=_cast_yearmonth_strings,
+        convert=_convert_yearmonths,
+        wrap=lambda array: pd.arrays.PeriodArray(array, freq='M'),
+        restore=lambda field, value: field.cast_value((value.year, value.month))),
+}
+
+_NATIVE_CASTS = {
+    'any': (lambda kind: True, lambda values: values),
+    'boolean': (lambda kind: kind is bool, lambda values: values.astype(bool)),
+    'datetime': (lambda kind: issubclass(kind, datetime.datetime), lambda values: values),
+    'integer': (lambda kind: kind in six.integer_types, lambda values: values.astype(np.int64)),
+    'number': (lambda kind: kind in six.integer_types or issubclass(kind, float),
+               lambda values: values.astype(np.float64)),
+}
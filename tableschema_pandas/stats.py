@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from __future__ import division
+from __future__ import print_function
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import time
+import contextlib
+import collections
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+# Module API
+
+class Stats(object):
+    """Timings and counters of a storage operation
+
+    Every phase records elapsed seconds and a number of calls. Net
+    allocated bytes are recorded too if `tracemalloc` is tracing.
+
+    # Arguments
+        operation (str): operation name (`write`, `iter`, `get`, `export` or `describe`)
+        bucket (str): bucket name
+
+    """
+
+    # Public
+
+    def __init__(self, operation=None, bucket=None):
+        self.operation = operation
+        self.bucket = bucket
+        self.rows = 0
+        self.phases = collections.OrderedDict()
+        self.counters = collections.Counter()
+
+    def __repr__(self):
+        return 'Stats(%s)' % self.to_dict()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Measure a phase of the operation
+
+        # Arguments
+            name (str): phase name (repeated phases are summed up)
+
+        """
+        tracing = tracemalloc is not None and tracemalloc.is_tracing()
+        if tracing:
+            memory = tracemalloc.get_traced_memory()[0]
+        start = _timer()
+        try:
+            yield
+        finally:
+            phase = self.phases.get(name)
+            if phase is None:
+                phase = self.phases[name] = {'seconds': 0.0, 'calls': 0, 'bytes': None}
+            phase['seconds'] += _timer() - start
+            phase['calls'] += 1
+            if tracing:
+                memory = tracemalloc.get_traced_memory()[0] - memory
+                phase['bytes'] = (phase['bytes'] or 0) + memory
+
+    def count(self, name, value=1):
+        """Increment a counter
+
+        # Arguments
+            name (str): counter name
+            value (int): increment
+
+        """
+        self.counters[name] += value
+
+    def to_dict(self):
+        """Return stats as a dict
+        """
+        return {
+            'operation': self.operation,
+            'bucket': self.bucket,
+            'rows': self.rows,
+            'phases': dict((name, dict(phase)) for name, phase in self.phases.items()),
+            'counters': dict(self.counters),
+        }
+
+
+class NullStats(Stats):
+    """Stats ignoring everything (used when instrumentation is disabled)
+    """
+
+    # Public
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def count(self, name, value=1):
+        pass
+
+
+# Internal
+
+class _NullPhase(object):
+
+    # Public
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+_timer = getattr(time, 'perf_counter', time.time)
@@ -4,16 +4,35 @@ from __future__ import print_function
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import io
+import os
+import sys
 import six
+import copy
+import shutil
+import operator
+import itertools
+import threading
+import contextlib
 import collections
+import multiprocessing
 import tableschema
+import numpy as np
 import pandas as pd
-from .mapper import Mapper
+from .stats import Stats, NullStats
+from .mapper import Mapper, pdc
+from .columnar import write_dataframe, read_dataframe, write_json, read_json
+from .columnar import replace_directory
+# Async methods use syntax of Python 3.6+
+if sys.version_info >= (3, 6):
+    from .aio import AsyncStorageMixin
+else:
+    AsyncStorageMixin = object
 
 
 # Module API
 
-class Storage(tableschema.Storage):
+class Storage(AsyncStorageMixin, tableschema.Storage):
     """Pandas storage
 
     Package implements
@@ -24,21 +43,134 @@ class Storage(tableschema.Storage):
 
     > Only additional API is documented
 
+    On Python 3.6+ there are also `storage.awrite`, `storage.aiter` and
+    `storage.aread` coroutines not blocking an asyncio event loop.
+
+    Storage can be shared by threads. Changes of a bucket (writes, describe,
+    create and delete) are serialized by a lock of the bucket, so writers
+    of different buckets run in parallel. Reads take a snapshot of a bucket
+    when they are called (`storage.iter` and `storage.iter_batches` too,
+    not on the first row) and don't hold the lock while restoring rows,
+    so they don't block writers and don't see changes made after the call.
+
     # Arguments
         dataframes (object[]): list of storage dataframes
+        consolidate_threshold (int):
+            number of written batches kept pending per bucket before
+            they are concatenated into its dataframe (by default
+            it happens only on the first read)
+        nullable (bool):
+            store integer, boolean and string fields using pandas nullable
+            dtypes (`Int64`, `boolean`, `string`) so nulls don't turn
+            integers into floats
+        categorical_threshold (float):
+            store string fields as categoricals if a ratio of distinct
+            values to all values in written rows is under this threshold
+            (fields with an `enum` constraint are always categoricals)
+        workers (int):
+            number of processes casting written rows in parallel
+            (by default, and for writes of a single chunk, rows are cast
+            in the current process)
+        chunk_size (int):
+            number of written rows cast by a worker at once
+            (the categorical threshold is applied per chunk)
+        path (str):
+            directory to keep buckets in; every bucket is persisted there
+            as a file per column with its descriptor alongside, and is
+            memory-mapped only when its data is accessed (written rows are
+            persisted by every write as parts merged into the bucket files
+            when the bucket is consolidated)
+        memory_budget (int):
+            approximate number of bytes of bucket data kept in memory
+            for a storage with a path; least recently used buckets are
+            persisted and unloaded when it's exceeded
+        sample_size (int):
+            number of non-null values of object columns inspected to
+            restore their types (by default all values are inspected)
+        infer_constraints (bool):
+            restore `required` and `unique` constraints of columns
+            having no nulls or no duplicates
+        stats_callback (func):
+            function called with `tableschema_pandas.stats.Stats` of every
+            write, iter, get, export and describe: rows, timings of its phases
+            (e.g. cast, index, dataframe, consolidate) and counters of casts
+            that fell back to Python (e.g. `cell_casts`, `json_fallbacks`)
+        compact (bool):
+            store integer and year fields using the smallest integer dtype
+            fitting `minimum` and `maximum` constraints if both are declared
+            or written values otherwise (appends upcast it if needed)
+        compact_floats (bool):
+            store number fields as `float32` (lossy for values having
+            more than 7 significant digits)
+        native_temporal (bool):
+            store date, time, duration and yearmonth fields as `datetime64`,
+            `timedelta64` and period columns parsed with field formats,
+            and datetime fields as UTC datetimes with a time zone
+            (they are read as timezone-aware datetimes)
+        validate (bool):
+            cast written values without their field constraints and check
+            the constraints (and uniqueness of primary keys) of all written
+            rows column by column, raising `ValidationError` listing every
+            failed constraint (see `storage.validate`) if they aren't met
 
     """
 
     # Public
 
-    def __init__(self, dataframes=None):
+    def __init__(self, dataframes=None, consolidate_threshold=None, nullable=False,
+                 categorical_threshold=None, workers=None, chunk_size=100000,
+                 path=None, memory_budget=None, sample_size=None, infer_constraints=False,
+                 stats_callback=None, compact=False, compact_floats=False,
+                 native_temporal=False, validate=False):
 
         # Set attributes
         self.__dataframes = dataframes or collections.OrderedDict()
         self.__descriptors = {}
+        self.__restored = {}
+        self.__pending = {}
+        self.__keys = {}
+        self.__consolidate_threshold = consolidate_threshold
+        self.__workers = workers
+        self.__chunk_size = chunk_size
+        self.__path = path
+        self.__memory_budget = memory_budget
+        self.__recent = collections.OrderedDict()
+        self.__stats_callback = stats_callback
+        self.__validate = validate
+        self.__lock = threading.RLock()
+        self.__locks = {}
+        # Data directories of buckets opened from a saved storage (loaded on access)
+        self.__sources = {}
+        # Buckets having dataframes referenced outside (copied before updates in place)
+        self.__shared = set(self.__dataframes)
 
         # Create mapper
-        self.__mapper = Mapper()
+        self.__mapper_options = {
+            'nullable': nullable,
+            'categorical_threshold': categorical_threshold,
+            'sample_size': sample_size,
+            'infer_constraints': infer_constraints,
+            'compact': compact,
+            'compact_floats': compact_floats,
+            'native_temporal': native_temporal,
+            'validate': validate,
+        }
+        self.__mapper = Mapper(**self.__mapper_options)
+
+        # Open directory
+        if self.__path is not None:
+            if not os.path.isdir(self.__path):
+                os.makedirs(self.__path)
+            for bucket in list(self.__dataframes):
+                self.__persist(bucket)
+            for bucket, data_path, contents in _read_buckets(self.__path):
+                pending = _read_parts(os.path.join(self.__get_bucket_path(bucket), 'pending'))
+                if pending:
+                    self.__pending[bucket] = pending
+                # Restored descriptors don't cover written parts
+                if not (pending and contents['restored']):
+                    self.__open_bucket(bucket, contents)
+                self.__dataframes.setdefault(bucket, None)
 
     def __repr__(self):
         return 'Storage'
@@ -50,11 +182,17 @@ class Storage(tableschema.Storage):
             name (str): name
 
         """
-        return self.__dataframes[key]
+        with self.__locking([key]):
+            self.__consolidate(key)
+            dataframe = self.__load(key)
+            self.__shared.add(key)
+            self.__evict(key)
+        return dataframe
 
     @property
     def buckets(self):
-        return list(sorted(self.__dataframes.keys()))
+        with self.__lock:
+            return list(sorted(self.__dataframes.keys()))
 
     def create(self, bucket, descriptor, force=False):
 
@@ -66,19 +204,27 @@ class Storage(tableschema.Storage):
         if isinstance(descriptor, dict):
             descriptors = [descriptor]
 
-        # Check buckets for existence
-        for bucket in buckets:
-            if bucket in self.buckets:
-                if not force:
-                    message = 'Bucket "%s" already exists' % bucket
-                    raise tableschema.exceptions.StorageError(message)
-                self.delete(bucket)
-
-        # Define dataframes
-        for bucket, descriptor in zip(buckets, descriptors):
-            tableschema.validate(descriptor)
-            self.__descriptors[bucket] = descriptor
-            self.__dataframes[bucket] = pd.DataFrame()
+        with self.__locking(buckets):
+
+            # Check buckets for existence
+            for bucket in buckets:
+                if bucket in self.buckets:
+                    if not force:
+                        message = 'Bucket "%s" already exists' % bucket
+                        raise tableschema.exceptions.StorageError(message)
+                    self.delete(bucket)
+
+            # Define dataframes
+            for bucket, descriptor in zip(buckets, descriptors):
+                tableschema.validate(descriptor)
+                with self.__lock:
+                    self.__descriptors[bucket] = descriptor
+                    self.__dataframes[bucket] = pd.DataFrame()
+                    self.__pending.pop(bucket, None)
+                    self.__restored.pop(bucket, None)
+                    self.__shared.discard(bucket)
+                    self.__keys[bucket] = {'monotonic': True, 'unique': True, 'last': None}
+                self.__persist(bucket)
 
     def delete(self, bucket=None, ignore=False):
 
@@ -87,75 +233,1251 @@ class Storage(tableschema.Storage):
         if isinstance(bucket, six.string_types):
             buckets = [bucket]
         elif bucket is None:
-            buckets = reversed(self.buckets)
+            buckets = list(reversed(self.buckets))
 
         # Iterate over buckets
-        for bucket in buckets:
+        with self.__locking(buckets):
+            for bucket in buckets:
 
-            # Non existent bucket
-            if bucket not in self.buckets:
-                if not ignore:
-                    message = 'Bucket "%s" doesn\'t exist' % bucket
-                    raise tableschema.exceptions.StorageError(message)
-                return
+                # Non existent bucket
+                if bucket not in self.buckets:
+                    if not ignore:
+                        message = 'Bucket "%s" doesn\'t exist' % bucket
+                        raise tableschema.exceptions.StorageError(message)
+                    return
 
-            # Remove from descriptors
-            if bucket in self.__descriptors:
-                del self.__descriptors[bucket]
+                # Remove from descriptors and dataframes
+                with self.__lock:
+                    self.__descriptors.pop(bucket, None)
+                    self.__dataframes.pop(bucket, None)
+                    self.__sources.pop(bucket, None)
+                    self.__pending.pop(bucket, None)
+                    self.__restored.pop(bucket, None)
+                    self.__recent.pop(bucket, None)
+                    self.__keys.pop(bucket, None)
+                    self.__shared.discard(bucket)
 
-            # Remove from dataframes
-            if bucket in self.__dataframes:
-                del self.__dataframes[bucket]
+                # Remove from directory
+                if self.__path is not None:
+                    shutil.rmtree(self.__get_bucket_path(bucket), ignore_errors=True)
 
     def describe(self, bucket, descriptor=None):
+        stats = self.__create_stats('describe', bucket)
+        with self.__locking([bucket]):
+            descriptor = self.__describe(bucket, descriptor, stats)
+        self.__report_stats(stats)
+        return descriptor
+
+    def iter(self, bucket, fields=None, where=None):
+        """Iterate over bucket rows
+
+        Rows are filtered and projected on the dataframe before any value
+        is restored (see `storage.iter_batches`).
+
+        # Arguments
+            bucket (str): bucket name
+            fields (str[]): names of fields to yield (all by default)
+            where (tuple[]): conditions rows have to meet
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket, a field or an operator doesn't exist, a field is repeated
+                or a value can't be cast
+
+        # Returns
+            iterator: rows
+
+        """
+        batches = self.iter_batches(bucket, fields=fields, where=where)
+        return itertools.chain.from_iterable(batches)
+
+    def iter_batches(self, bucket, batch_size=10000, as_frame=False, fields=None, where=None):
+        """Iterate over bucket rows in batches
+
+        Conditions are `(field, operator, value)` tuples where operator
+        is one of `==`, `!=`, `<`, `<=`, `>`, `>=` or `in` (with a list of
+        values). Values are cast the way written ones are, and `None` can be
+        compared for (in)equality to match nulls. A range of a sorted primary
+        key is sliced from the index without comparing other keys.
+
+        # Arguments
+            bucket (str): bucket name
+            batch_size (int): maximum number of rows in a batch
+            as_frame (bool):
+                yield dataframe slices (views of the bucket's dataframe
+                if no rows or fields are selected) instead of lists of
+                restored rows
+            fields (str[]): names of fields to yield (all by default)
+            where (tuple[]): conditions rows have to meet (all of them)
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket, a field or an operator doesn't exist, a field is repeated,
+                a value can't be cast
+                or batch size isn't positive
+
+        # Returns
+            iterator: batches of rows
+
+        """
+
+        # Prepare
+        if batch_size < 1:
+            message = 'Batch size has to be positive (got %s)' % batch_size
+            raise tableschema.exceptions.StorageError(message)
+        stats = self.__create_stats('iter', bucket)
+        descriptor, dataframe, keys = self.__snapshot(bucket, stats)
+        schema = self.__mapper.compile_descriptor(descriptor).schema
+
+        # Select rows and fields
+        if fields is not None or where:
+            with stats.phase('select'):
+                dataframe, schema = self.__select(
+                    bucket, dataframe, keys, descriptor, fields, where)
+
+        return self.__iter_batches(dataframe, schema, batch_size, as_frame, stats)
+
+    def read(self, bucket, fields=None, where=None):
+        rows = []
+        for batch in self.iter_batches(bucket, fields=fields, where=where):
+            rows.extend(batch)
+        return rows
+
+    def write(self, bucket, rows, mode='append'):
+        """Write rows to bucket
+
+        In the `upsert` and `ignore` modes written keys are looked up in
+        primary key indexes of the bucket (without concatenating its pending
+        data frames), rows having existing keys update them in place or are
+        skipped, and only rows having new keys are appended. So the cost is
+        proportional to the number of written rows (for buckets persisted
+        to a path updates rewrite the bucket files).
+
+        # Arguments
+            bucket (str): bucket name
+            rows (list[]): rows
+            mode (str):
+                `append` (rows are appended as is), `upsert` (rows update
+                rows having the same key) or `ignore` (rows having existing
+                keys are skipped); in the last two modes only the last
+                (upsert) or first (ignore) written row of a key is kept
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket or mode doesn't exist or mode isn't `append`
+                for a bucket having no primary key
+            tableschema.exceptions.ValidationError:
+                if storage validates rows and they don't satisfy constraints
+                (in the `upsert` and `ignore` modes only rows that are kept
+                are checked, and `unique` values of upserted rows aren't
+                compared with values of rows they replace)
+
+        """
+
+        # Prepare
+        if mode not in ('append', 'upsert', 'ignore'):
+            message = 'Mode "%s" is not supported' % mode
+            raise tableschema.exceptions.StorageError(message)
+        stats = self.__create_stats('write', bucket)
+        with self.__locking([bucket]):
+            if bucket not in self.buckets:
+                message = 'Bucket "%s" doesn\'t exist.' % bucket
+                raise tableschema.exceptions.StorageError(message)
+            descriptor = self.__describe(bucket, None, stats)
+            if mode != 'append' and not descriptor.get('primaryKey'):
+                message = 'Bucket "%s" has no primary key' % bucket
+                raise tableschema.exceptions.StorageError(message)
+            if self.__workers:
+                with stats.phase('convert'):
+                    new_data_frames = self.__convert_in_parallel(descriptor, rows)
+                    stats.rows += sum(map(len, new_data_frames))
+            else:
+                new_data_frames = [self.__mapper.convert_descriptor_and_rows(
+                    descriptor, rows, stats=stats)]
+            if self.__validate:
+                self.__check_constraints(bucket, descriptor, new_data_frames, mode, stats)
+
+            # Update or skip rows having existing keys
+            unique = False
+            if mode != 'append':
+                unique = self.__keys.get(bucket, {}).get('unique')
+                with stats.phase('merge'):
+                    new_data_frames = self.__merge(bucket, new_data_frames, mode, stats)
+
+            # Keep new data frames pending so appends don't copy the whole bucket
+            self.__append(bucket, new_data_frames, stats)
+            if unique and bucket in self.__keys:
+                # Only new keys are appended so unique keys stay unique
+                self.__keys[bucket]['unique'] = True
+        self.__report_stats(stats)
+
+    def load_csv(self, bucket, path, descriptor=None, chunk_size=100000, **options):
+        """Load CSV file to bucket
+
+        The file is read by the pandas C parser in chunks. Number fields
+        are parsed natively, and other fields are read as strings and cast
+        column by column the way `storage.write` casts them, so the bucket
+        gets the same data as writing rows of the file (but faster).
+
+        # Arguments
+            bucket (str): bucket name
+            path (str): path to CSV file having a header row with field names
+            descriptor (dict):
+                descriptor to create the bucket with (by default rows are
+                appended to the existing bucket)
+            chunk_size (int): number of rows parsed and cast at once
+            options (dict): `pandas.read_csv` options (e.g. `sep`, `encoding`)
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket exists and descriptor is given or bucket doesn't
+                exist and descriptor is not given
+            tableschema.exceptions.ValidationError:
+                if storage validates rows and they don't satisfy constraints
+
+        """
+
+        with self.__locking([bucket]):
+
+            # Create bucket
+            if descriptor is not None:
+                self.create(bucket, descriptor)
+            elif bucket not in self.buckets:
+                message = 'Bucket "%s" doesn\'t exist.' % bucket
+                raise tableschema.exceptions.StorageError(message)
+
+            # Read chunks (starting again with strings if numbers can't be parsed)
+            stats = self.__create_stats('write', bucket)
+            descriptor = self.__describe(bucket, None, stats)
+            try:
+                new_data_frames = self.__read_csv(descriptor, path, chunk_size, options, stats)
+            except _ParserError:
+                stats.count('parser_fallbacks')
+                new_data_frames = self.__read_csv(
+                    descriptor, path, chunk_size, options, stats, native=False)
+            if self.__validate:
+                self.__check_constraints(bucket, descriptor, new_data_frames, 'append', stats)
+
+            # Keep new data frames pending (all or nothing as for write)
+            self.__append(bucket, new_data_frames, stats)
+        self.__report_stats(stats)
+
+    def validate(self, bucket):
+        """Check field constraints of bucket rows column by column
+
+        Every constraint (and uniqueness of the primary key) is checked
+        for a whole column at once, so all failed rows are reported.
+
+        # Arguments
+            bucket (str): bucket name
+
+        # Raises
+            tableschema.exceptions.StorageError: if bucket doesn't exist
+
+        # Returns
+            dict[]: failed constraints in field order (the primary key last)
+            as dicts having `field` (a list of names for the primary key),
+            `constraint` and `rows` (positions of failed rows) keys
+
+        """
+        stats = self.__create_stats('validate', bucket)
+        descriptor, dataframe, keys = self.__snapshot(bucket, stats)
+        stats.rows += len(dataframe)
+        errors = []
+        if len(dataframe.columns) or len(dataframe):
+            errors = self.__mapper.validate_dataframes(descriptor, [dataframe], stats=stats)
+        self.__report_stats(stats)
+        return errors
+
+    def get(self, bucket, key):
+        """Get bucket row by primary key
+
+        # Arguments
+            bucket (str): bucket name
+            key (any): key value (a list of values for a composite key)
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket doesn't exist or has no primary key
+
+        # Returns
+            list/None: row (the first written one for a duplicated key)
+            or None if there is no row with this key
+
+        """
+        return self.get_many(bucket, [key])[0]
+
+    def get_many(self, bucket, keys):
+        """Get bucket rows by primary keys
+
+        Keys are looked up in the dataframe index without scanning rows,
+        and only the found rows are restored.
+
+        # Arguments
+            bucket (str): bucket name
+            keys (list): key values (lists of values for a composite key)
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket doesn't exist or has no primary key
+
+        # Returns
+            list[]: rows in the order of keys (None for missing keys)
+
+        """
+
+        # Prepare
+        stats = self.__create_stats('get', bucket)
+        descriptor, dataframe, bucket_keys = self.__snapshot(bucket, stats)
+        schema = self.__mapper.compile_descriptor(descriptor).schema
+        if not schema.primary_key:
+            message = 'Bucket "%s" has no primary key' % bucket
+            raise tableschema.exceptions.StorageError(message)
+
+        # Look up keys
+        with stats.phase('lookup'):
+            keys = self.__mapper.convert_keys(descriptor, keys)
+            positions = self.__locate(bucket, dataframe, bucket_keys, keys)
+
+        # Restore found rows
+        rows = [None] * len(keys)
+        found = np.flatnonzero(positions >= 0)
+        if len(found):
+            with stats.phase('restore'):
+                restored = self.__mapper.restore_rows(
+                    dataframe.iloc[positions[found]], schema, stats=stats)
+                for index, row in zip(found, restored):
+                    rows[index] = row
+        self.__report_stats(stats)
+
+        return rows
+
+    def write_arrow(self, bucket, table):
+        """Write Arrow table to bucket
+
+        Table columns are taken by bucket field names and converted to
+        the field dtypes without copying where possible.
+
+        # Arguments
+            bucket (str): bucket name
+            table (pyarrow.Table): Arrow table
+
+        # Raises
+            tableschema.exceptions.StorageError: if pyarrow is not installed
+            tableschema.exceptions.ValidationError:
+                if storage validates rows and they don't satisfy constraints
+
+        """
+        stats = self.__create_stats('write', bucket)
+        with self.__locking([bucket]):
+            descriptor = self.__describe(bucket, None, stats)
+            with stats.phase('convert'):
+                new_data_frame = self.__mapper.convert_arrow_table(descriptor, table)
+                stats.rows += len(new_data_frame)
+            if self.__validate:
+                self.__check_constraints(bucket, descriptor, [new_data_frame], 'append', stats)
+            self.__append(bucket, [new_data_frame], stats)
+        self.__report_stats(stats)
+
+    def to_arrow(self, bucket):
+        """Return bucket as Arrow table
+
+        # Arguments
+            bucket (str): bucket name
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket doesn't exist or pyarrow is not installed
+
+        # Returns
+            pyarrow.Table: Arrow table with a column per field
+
+        """
+
+        # Convert
+        descriptor, dataframe, keys = self.__snapshot(bucket, NullStats())
+        schema = self.__mapper.compile_descriptor(descriptor).schema
+        if not len(dataframe):
+            # Empty buckets get typed columns (e.g. for the Arrow schema)
+            dataframe = self.__mapper.convert_descriptor_and_rows(descriptor, [])
+        return self.__mapper.restore_arrow_table(dataframe, schema)
+
+    def export(self, bucket, path, format='csv', chunk_size=100000, descriptor_path=None):
+        """Export bucket to file
+
+        Values are formatted column by column (distinct values only once)
+        and written in chunks, so rows are never restored one by one.
+        Supported formats are `csv` (Table Schema representation of values),
+        `json` (JSON lines with native numbers, booleans and objects)
+        and `parquet` (requires `pyarrow`).
+
+        # Arguments
+            bucket (str): bucket name
+            path (str): path to file to export to
+            format (str): `csv`, `json` or `parquet`
+            chunk_size (int): number of rows formatted and written at once
+            descriptor_path (str): path to also write the bucket descriptor to
+
+        # Raises
+            tableschema.exceptions.StorageError:
+                if bucket or format doesn't exist or pyarrow is not installed
+
+        """
+
+        # Check format
+        if format not in ('csv', 'json', 'parquet'):
+            message = 'Format "%s" is not supported' % format
+            raise tableschema.exceptions.StorageError(message)
+
+        # Prepare
+        stats = self.__create_stats('export', bucket)
+        descriptor, dataframe, keys = self.__snapshot(bucket, stats)
+        schema = self.__mapper.compile_descriptor(descriptor).schema
+        if not len(dataframe):
+            # Empty buckets get typed columns (e.g. for the Parquet schema)
+            dataframe = self.__mapper.convert_descriptor_and_rows(descriptor, [])
+
+        # Write chunks
+        if format == 'parquet':
+            file = _ParquetFile(path)
+        else:
+            file = io.open(path, 'w', encoding='utf-8', newline='')
+        try:
+            for start in range(0, max(len(dataframe), 1), chunk_size):
+                chunk = dataframe.iloc[start:start + chunk_size]
+                with stats.phase('format'):
+                    if format == 'csv':
+                        chunk = self.__mapper.format_dataframe(chunk, schema).to_csv(
+                            header=not start, index=False, na_rep='')
+                    elif format == 'json':
+                        chunk = self.__mapper.format_json_lines(chunk, schema)
+                    else:
+                        chunk = self.__mapper.restore_arrow_table(chunk, schema)
+                with stats.phase('write'):
+                    file.write(chunk)
+                stats.rows += min(chunk_size, len(dataframe) - start)
+        finally:
+            file.close()
+
+        # Write descriptor
+        if descriptor_path is not None:
+            write_json(descriptor_path, descriptor)
+        self.__report_stats(stats)
+
+    def save(self, path):
+        """Save all buckets to a directory
+
+        Buckets are saved the way a storage having a path keeps them:
+        a file per column (numeric, boolean and temporal columns as plain
+        `.npy` files) with the bucket descriptor alongside, and options
+        of the storage casting values (e.g. `nullable`) are saved too.
+        Buckets are saved as they are when it's called (writes made while
+        files are written are not saved) and the directory is replaced
+        at once.
+
+        # Arguments
+            path (str): directory path (replaced if it exists)
+
+        """
+        stats = self.__create_stats('save', None)
+
+        # Take snapshots of all buckets at once
+        buckets = self.buckets
+        with self.__locking(buckets):
+            snapshots = []
+            for bucket in buckets:
+                restored = bucket not in self.__descriptors
+                descriptor, dataframe, keys = self.__snapshot(bucket, stats)
+                snapshots.append((bucket, restored, descriptor, dataframe))
+
+        # Write buckets
+        temp_path = path + '.tmp'
+        if os.path.exists(temp_path):
+            shutil.rmtree(temp_path)
+        os.makedirs(temp_path)
+        with stats.phase('save'):
+            write_json(os.path.join(temp_path, 'storage.json'), {
+                'options': self.__mapper_options})
+            for bucket, restored, descriptor, dataframe in snapshots:
+                bucket_path = os.path.join(temp_path, _quote(bucket))
+                os.makedirs(bucket_path)
+                write_dataframe(os.path.join(bucket_path, 'data'), dataframe)
+                contents = {'descriptor': descriptor, 'restored': restored}
+                write_json(os.path.join(bucket_path, 'descriptor.json'), contents)
+                stats.rows += len(dataframe)
+        replace_directory(temp_path, path)
+        self.__report_stats(stats)
+
+    @classmethod
+    def open(cls, path, mmap=True, **options):
+        """Open storage saved by `storage.save`
+
+        With `mmap` opening reads only descriptors, and data of a bucket
+        is memory-mapped when it's accessed first, so only pages of values
+        being read are loaded (object columns are unpickled as a whole).
+
+        # Arguments
+            path (str): directory path
+            mmap (bool):
+                memory-map bucket data (copy-on-write, changes aren't written
+                back to the directory) instead of loading it on opening
+            options (dict):
+                other storage options (saved options casting values are
+                used by default)
+
+        # Raises
+            tableschema.exceptions.StorageError: if directory doesn't exist
+
+        # Returns
+            Storage: storage
+
+        """
+        if not os.path.isdir(path):
+            message = 'Directory "%s" doesn\'t exist' % path
+            raise tableschema.exceptions.StorageError(message)
+        options_path = os.path.join(path, 'storage.json')
+        if os.path.exists(options_path):
+            options = dict(read_json(options_path)['options'], **options)
+        storage = cls(**options)
+        for bucket, data_path, contents in _read_buckets(path):
+            storage.__open_bucket(bucket, contents)
+            if mmap:
+                storage.__sources[bucket] = data_path
+                storage.__dataframes[bucket] = None
+            else:
+                storage.__dataframes[bucket] = read_dataframe(data_path)
+        return storage
+
+    # Private
+
+    @contextlib.contextmanager
+    def __locking(self, buckets):
+        # Locks are taken in order so changes of many buckets don't deadlock
+        with self.__lock:
+            locks = [self.__locks.setdefault(bucket, threading.RLock())
+                     for bucket in sorted(set(buckets))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def __open_bucket(self, bucket, contents):
+        if contents['restored']:
+            self.__restored[bucket] = contents['descriptor']
+        else:
+            self.__descriptors[bucket] = contents['descriptor']
+
+    def __snapshot(self, bucket, stats):
+        # Dataframes aren't changed in place once they are referenced outside
+        with self.__locking([bucket]):
+            if bucket not in self.buckets:
+                message = 'Bucket "%s" doesn\'t exist.' % bucket
+                raise tableschema.exceptions.StorageError(message)
+            self.__consolidate(bucket, stats)
+            descriptor = self.__describe(bucket, None, stats)
+            dataframe = self.__load(bucket)
+            keys = copy.copy(self.__keys.get(bucket))
+            self.__shared.add(bucket)
+            self.__evict(bucket)
+        return descriptor, dataframe, keys
+
+    def __iter_batches(self, dataframe, schema, batch_size, as_frame, stats):
+
+        # Yield batches
+        try:
+            for start in range(0, len(dataframe), batch_size):
+                batch = dataframe.iloc[start:start + batch_size]
+                if not as_frame:
+                    with stats.phase('restore'):
+                        batch = list(self.__mapper.restore_rows(batch, schema, stats=stats))
+                else:
+                    stats.rows += len(batch)
+                yield batch
+        finally:
+            self.__report_stats(stats)
+
+    def __read_csv(self, descriptor, path, chunk_size, options, stats, native=True):
+        plan = self.__mapper.compile_descriptor(descriptor)
+        names = plan.schema.field_names
+
+        # Get parser options
+        dtypes = dict((name, str) for name in names)
+        na_values = dict((name, []) for name in names)
+        if native:
+            for column in plan.columns:
+                if _is_native_number(column):
+                    dtypes[column.name] = np.float64
+                    na_values[column.name] = column.field.missing_values
+        options = dict(options, usecols=names, dtype=dtypes, na_values=na_values,
+                       keep_default_na=False, float_precision='round_trip', chunksize=chunk_size)
+
+        # Convert chunks
+        data_frames = []
+        reader = pd.read_csv(path, **options)
+        try:
+            while True:
+                with stats.phase('parse'):
+                    try:
+                        chunk = next(reader)
+                    except StopIteration:
+                        break
+                    except (TypeError, ValueError) as exception:
+                        if native:
+                            raise _ParserError(exception)
+                        raise
+                columns = [chunk[name].values for name in names]
+                data_frames.append(self.__mapper.convert_descriptor_and_columns(
+                    descriptor, columns, stats=stats))
+        finally:
+            reader.close()
+
+        # No rows still produce a data frame with columns
+        if not data_frames:
+            data_frames.append(self.__mapper.convert_descriptor_and_rows(descriptor, []))
+
+        return _continue_ranges(data_frames)
+
+    def __describe(self, bucket, descriptor, stats):
 
         # Set descriptor
         if descriptor is not None:
             self.__descriptors[bucket] = descriptor
+            self.__persist(bucket, data=False)
 
         # Get descriptor
         else:
             descriptor = self.__descriptors.get(bucket)
             if descriptor is None:
-                dataframe = self.__dataframes[bucket]
-                descriptor = self.__mapper.restore_descriptor(dataframe)
+                # Restored descriptors are cached until the bucket is written
+                self.__consolidate(bucket, stats)
+                descriptor = self.__restored.get(bucket)
+                if descriptor is None:
+                    with stats.phase('restore_descriptor'):
+                        dataframe = self.__load(bucket)
+                        descriptor = self.__mapper.restore_descriptor(dataframe)
+                    self.__restored[bucket] = descriptor
+                    self.__evict(bucket)
+                else:
+                    stats.count('cached_descriptors')
+                descriptor = copy.deepcopy(descriptor)
 
         return descriptor
 
-    def iter(self, bucket):
+    def __select(self, bucket, dataframe, keys, descriptor, fields, where):
+        schema = self.__mapper.compile_descriptor(descriptor).schema
+        conditions = list(where or [])
 
-        # Check existense
-        if bucket not in self.buckets:
-            message = 'Bucket "%s" doesn\'t exist.' % bucket
-            raise tableschema.exceptions.StorageError(message)
+        # Check fields and operators
+        for name in list(fields or []) + [condition[0] for condition in conditions]:
+            if name not in schema.field_names:
+                message = 'Field "%s" doesn\'t exist' % name
+                raise tableschema.exceptions.StorageError(message)
+        for name, count in collections.Counter(fields or []).items():
+            if count > 1:
+                message = 'Field "%s" is selected more than once' % name
+                raise tableschema.exceptions.StorageError(message)
+        for name, comparison, value in conditions:
+            if comparison not in _OPERATORS and comparison != 'in':
+                message = 'Operator "%s" is not supported' % comparison
+                raise tableschema.exceptions.StorageError(message)
 
-        # Prepare
-        descriptor = self.describe(bucket)
-        schema = tableschema.Schema(descriptor)
+        # Cast values the way written ones are (even if there are no rows)
+        for number, (name, comparison, value) in enumerate(conditions):
+            if comparison == 'in':
+                value = self.__mapper.convert_values(descriptor, name, list(value))
+            elif value is not None:
+                value = self.__mapper.convert_values(descriptor, name, [value])[0]
+            conditions[number] = (name, comparison, value)
 
-        # Yield rows
-        for pk, row in self.__dataframes[bucket].iterrows():
-            row = self.__mapper.restore_row(row, schema=schema, pk=pk)
-            yield row
+        # Slice a range of a sorted primary key
+        if len(schema.primary_key) == 1 and len(dataframe):
+            keys = self.__get_keys(bucket, dataframe, keys)
+            if keys['monotonic']:
+                start, stop = 0, len(dataframe)
+                for condition in list(conditions):
+                    name, comparison, value = condition
+                    if name != schema.primary_key[0] or comparison not in _RANGE_SIDES:
+                        continue
+                    if value is None:
+                        continue
+                    start_side, stop_side = _RANGE_SIDES[comparison]
+                    try:
+                        if start_side is not None:
+                            start = max(start, dataframe.index.searchsorted(value, side=start_side))
+                        if stop_side is not None:
+                            stop = min(stop, dataframe.index.searchsorted(value, side=stop_side))
+                    except TypeError:
+                        continue
+                    conditions = [other for other in conditions if other is not condition]
+                dataframe = dataframe.iloc[start:max(start, stop)]
 
-    def read(self, bucket):
-        rows = list(self.iter(bucket))
-        return rows
+        # Filter rows by other conditions
+        if conditions and len(dataframe):
+            mask = np.ones(len(dataframe), dtype=bool)
+            for name, comparison, value in conditions:
+                if name in schema.primary_key:
+                    values = dataframe.index.get_level_values(name)
+                else:
+                    values = dataframe[name]
+                mask &= _compare(values, comparison, value)
+            dataframe = dataframe[mask]
 
-    def write(self, bucket, rows):
+        # Project fields
+        if fields is not None:
+            primary_key = [name for name in schema.primary_key if name in fields]
+            dataframe = dataframe[[name for name in fields if name not in primary_key]]
+            descriptor = {
+                'fields': [schema.get_field(name).descriptor for name in fields],
+                'primaryKey': primary_key,
+            }
+            schema = self.__mapper.compile_descriptor(descriptor).schema
 
-        # Prepare
-        descriptor = self.describe(bucket)
-        new_data_frame = self.__mapper.convert_descriptor_and_rows(descriptor, rows)
+        return dataframe, schema
 
-        # Just set new DataFrame if current is empty
-        if self.__dataframes[bucket].size == 0:
-            self.__dataframes[bucket] = new_data_frame
+    def __append(self, bucket, data_frames, stats):
+        self.__restored.pop(bucket, None)
+        pending = self.__pending.setdefault(bucket, [])
+        pending.extend(data_frames)
+        self.__track_keys(bucket, data_frames)
+        threshold = self.__consolidate_threshold
+        if threshold is not None and len(pending) >= threshold:
+            self.__consolidate(bucket, stats)
+        elif self.__path is not None:
+            with stats.phase('persist'):
+                for number in range(len(pending) - len(data_frames), len(pending)):
+                    self.__persist_part(bucket, number)
+        self.__touch(bucket)
+        self.__evict(bucket)
 
-        # Append new data frame to the old one setting new data frame
-        # containing data from both old and new data frames
+    def __merge(self, bucket, data_frames, mode, stats):
+        if len(data_frames) > 1:
+            data_frames = [pd.concat(_unify_categories(data_frames))]
+        data_frame = data_frames[0]
+
+        # Keep a row per written key
+        duplicated = data_frame.index.duplicated(keep='last' if mode == 'upsert' else 'first')
+        if duplicated.any():
+            stats.count('skipped_rows', int(duplicated.sum()))
+            data_frame = data_frame[~duplicated]
+
+        # Look up keys in every part of the bucket (indexes cache their hash tables)
+        found = np.zeros(len(data_frame), dtype=bool)
+        parts = [self.__load(bucket)] + self.__pending.get(bucket, [])
+        for number, part in enumerate(parts):
+            if not len(part) or found.all():
+                continue
+            index = part.index
+            positions = _locate(
+                index, data_frame.index, index.is_unique, index.is_monotonic_increasing)
+            matched = (positions >= 0) & ~found
+            if not matched.any():
+                continue
+            found |= matched
+            if mode == 'upsert':
+                # Readers keep dataframes they've got (and Arrow buffers are read-only)
+                if (number == 0 and bucket in self.__shared) or not _is_writeable(part):
+                    part = part.copy()
+                    if number == 0:
+                        self.__dataframes[bucket] = part
+                        self.__shared.discard(bucket)
+                    else:
+                        self.__pending[bucket][number - 1] = part
+                _update_rows(part, positions[matched], data_frame[matched])
+                stats.count('updated_rows', int(matched.sum()))
+                self.__restored.pop(bucket, None)
+                if self.__path is not None:
+                    with stats.phase('persist'):
+                        if number == 0:
+                            self.__persist(bucket)
+                        else:
+                            self.__persist_part(bucket, number - 1)
+            else:
+                stats.count('skipped_rows', int(matched.sum()))
+
+        # Return rows having new keys (nothing if there are no columns to define)
+        if found.any():
+            data_frame = data_frame[~found]
+        if not len(data_frame) and len(parts[0].columns):
+            return []
+        return [data_frame]
+
+    def __track_keys(self, bucket, data_frames):
+        # Appended keys are compared only with the last key so tracking is O(batch)
+        keys = self.__keys.get(bucket)
+        for data_frame in data_frames:
+            if keys is None:
+                break
+            keys = _append_keys(keys, data_frame.index)
+        if keys is None:
+            self.__keys.pop(bucket, None)
+        else:
+            self.__keys[bucket] = keys
+
+    def __get_keys(self, bucket, dataframe, keys):
+        # Buckets not created by this storage get their keys inspected once
+        index = dataframe.index
+        if keys is None:
+            keys = {'monotonic': None, 'unique': None, 'last': None}
+            if len(index):
+                keys['last'] = index[-1]
+        if keys['monotonic'] is None or keys['unique'] is None:
+            if keys['monotonic'] is None:
+                keys['monotonic'] = bool(index.is_monotonic_increasing)
+            if keys['unique'] is None:
+                keys['unique'] = bool(index.is_unique)
+            # Keys of a snapshot are kept unless the bucket has been changed since
+            with self.__locking([bucket]):
+                if self.__dataframes.get(bucket) is dataframe and not self.__pending.get(bucket):
+                    self.__keys[bucket] = dict(keys)
+        return keys
+
+    def __locate(self, bucket, dataframe, bucket_keys, keys):
+        # Return positions of the first rows having the keys (-1 if missing)
+        index = dataframe.index
+        if not len(index):
+            return np.full(len(keys), -1, dtype=np.intp)
+        bucket_keys = self.__get_keys(bucket, dataframe, bucket_keys)
+        return _locate(index, keys, bucket_keys['unique'], bucket_keys['monotonic'])
+
+    def __check_constraints(self, bucket, descriptor, data_frames, mode, stats):
+
+        # Appended rows are compared with rows of the bucket
+        if mode == 'append':
+            previous = [self.__load(bucket)] + self.__pending.get(bucket, [])
+            previous = [data_frame for data_frame in previous if len(data_frame)]
+            errors = self.__mapper.validate_dataframes(
+                descriptor, data_frames, previous=previous, stats=stats)
+
+        # Upserted and ignored rows are checked as they are merged (a row per key)
+        else:
+            if len(data_frames) > 1:
+                data_frames = [pd.concat(_unify_categories(data_frames))]
+            index = data_frames[0].index
+            kept = np.flatnonzero(~index.duplicated(keep='last' if mode == 'upsert' else 'first'))
+            previous = []
+            if _has_unique_fields(descriptor):
+                # Unique values are compared with stored rows the written ones don't replace
+                keys = index[kept]
+                for data_frame in [self.__load(bucket)] + self.__pending.get(bucket, []):
+                    if not len(data_frame):
+                        continue
+                    if mode == 'ignore':
+                        # Rows having existing keys are skipped
+                        kept = kept[~np.asarray(keys.isin(data_frame.index))]
+                        keys = index[kept]
+                        previous.append(data_frame)
+                    else:
+                        existing = np.asarray(data_frame.index.isin(keys))
+                        previous.append(data_frame[~existing] if existing.any() else data_frame)
+            errors = self.__mapper.validate_dataframes(
+                descriptor, [data_frames[0].iloc[kept]], previous=previous, check_keys=False,
+                stats=stats)
+            for error in errors:
+                error['rows'] = kept[error['rows']].tolist()
+
+        # Raise an error listing all failed constraints
+        if errors:
+            message = 'Written rows don\'t satisfy constraints: %s' % ', '.join(
+                '"%s" of "%s" (%s rows)' % (
+                    error['constraint'], _format_names(error['field']), len(error['rows']))
+                for error in errors)
+            raise tableschema.exceptions.ValidationError(message, errors=errors)
+
+    def __create_stats(self, operation, bucket):
+        if self.__stats_callback is None:
+            return NullStats()
+        return Stats(operation, bucket)
+
+    def __report_stats(self, stats):
+        if self.__stats_callback is not None:
+            self.__stats_callback(stats)
+
+    def __convert_in_parallel(self, descriptor, rows):
+
+        # A single chunk (or no rows) is cast in process as starting a pool would cost more
+        chunks = _iter_chunks(rows, self.__chunk_size)
+        first = list(itertools.islice(chunks, 2))
+        if len(first) < 2:
+            rows = first[0] if first else []
+            return [self.__mapper.convert_descriptor_and_rows(descriptor, rows)]
+
+        # Cast chunks in a process pool keeping a bounded number in flight
+        # (categoricals are decided on all rows, not per chunk)
+        options = dict(self.__mapper_options, categorical_threshold=None)
+        data_frames = []
+        pool = multiprocessing.Pool(self.__workers)
+        try:
+            results = collections.deque()
+            for chunk in itertools.chain(first, chunks):
+                arguments = (options, descriptor, chunk)
+                results.append(pool.apply_async(_convert_chunk, arguments))
+                if len(results) >= self.__workers * 2:
+                    data_frames.append(results.popleft().get())
+            while results:
+                data_frames.append(results.popleft().get())
+        finally:
+            pool.terminate()
+            pool.join()
+
+        data_frames = self.__mapper.convert_categoricals(descriptor, data_frames)
+        return _continue_ranges(data_frames)
+
+    def __consolidate(self, bucket, stats=None):
+        pending = self.__pending.pop(bucket, None)
+        if not pending:
+            return
+        stats = stats if stats is not None else NullStats()
+        with stats.phase('consolidate'):
+            self.__concat(bucket, pending)
+        if self.__path is not None:
+            with stats.phase('persist'):
+                self.__persist(bucket)
+
+    def __concat(self, bucket, pending):
+
+        # Skip data frames preceding the first non-empty one
+        # (an empty data frame is replaced by the next one)
+        data_frames = [self.__load(bucket)] + pending
+        while len(data_frames) > 1 and data_frames[0].size == 0:
+            data_frames.pop(0)
+
+        # Concatenate all the data frames at once
+        if len(data_frames) == 1:
+            self.__dataframes[bucket] = data_frames[0]
         else:
-            self.__dataframes[bucket] = pd.concat([
-                self.__dataframes[bucket],
-                new_data_frame,
-            ])
+            data_frames = _unify_categories(data_frames)
+            self.__dataframes[bucket] = pd.concat(data_frames)
+        self.__shared.discard(bucket)
+
+    def __load(self, bucket):
+        dataframe = self.__dataframes[bucket]
+        if dataframe is None:
+            data_path = self.__sources.get(bucket)
+            if data_path is None:
+                data_path = os.path.join(self.__get_bucket_path(bucket), 'data')
+            dataframe = read_dataframe(data_path, mmap=True)
+            self.__dataframes[bucket] = dataframe
+            self.__shared.discard(bucket)
+        self.__touch(bucket)
+        return dataframe
+
+    def __persist(self, bucket, data=True):
+        if self.__path is None or bucket not in self.__dataframes:
+            return
+        bucket_path = self.__get_bucket_path(bucket)
+        if not os.path.isdir(bucket_path):
+            os.makedirs(bucket_path)
+
+        # Write data (parts still pending are kept until they are consolidated)
+        if data:
+            dataframe = self.__dataframes[bucket]
+            write_dataframe(os.path.join(bucket_path, 'data'), dataframe)
+            if not self.__pending.get(bucket):
+                shutil.rmtree(os.path.join(bucket_path, 'pending'), ignore_errors=True)
+
+        # Write descriptor (a restored one is stored so describe doesn't load data)
+        restored = bucket not in self.__descriptors
+        if restored:
+            if data:
+                self.__restored[bucket] = self.__mapper.restore_descriptor(dataframe)
+            descriptor = self.__restored[bucket]
+        else:
+            descriptor = self.__descriptors[bucket]
+        contents = {'descriptor': descriptor, 'restored': restored}
+        write_json(os.path.join(bucket_path, 'descriptor.json'), contents)
+
+    def __persist_part(self, bucket, number):
+        # Pending data frames are persisted as numbered parts of the bucket
+        part_path = os.path.join(self.__get_bucket_path(bucket), 'pending', str(number))
+        write_dataframe(part_path, self.__pending[bucket][number])
+
+    def __touch(self, bucket):
+        if self.__path is None:
+            return
+        with self.__lock:
+            self.__recent.pop(bucket, None)
+            self.__recent[bucket] = True
+
+    def __evict(self, bucket):
+        if self.__path is None or self.__memory_budget is None:
+            return
+
+        # Get memory usage of loaded and pending data frames
+        usages = collections.OrderedDict()
+        with self.__lock:
+            for name in self.__recent:
+                data_frames = [self.__dataframes.get(name)] + self.__pending.get(name, [])
+                usages[name] = data_frames
+
+        # Unload least recently used buckets but the given one (and ones being changed)
+        for name, data_frames in usages.items():
+            usages[name] = sum(_get_memory_usage(data_frame)
+                               for data_frame in data_frames if data_frame is not None)
+        for name in usages:
+            if sum(usages.values()) <= self.__memory_budget:
+                break
+            if name != bucket:
+                with self.__lock:
+                    lock = self.__locks.setdefault(name, threading.RLock())
+                if not lock.acquire(False):
+                    continue
+                try:
+                    if name in self.__dataframes:
+                        self.__consolidate(name)
+                        self.__dataframes[name] = None
+                    with self.__lock:
+                        self.__recent.pop(name, None)
+                    usages[name] = 0
+                finally:
+                    lock.release()
+
+    def __get_bucket_path(self, bucket):
+        return os.path.join(self.__path, _quote(bucket))
+
+
+# Internal
+
+def _quote(bucket):
+    return six.moves.urllib.parse.quote(bucket, safe='')
+
+
+def _read_buckets(path):
+    # Buckets kept in a directory with their data paths and descriptors
+    for name in os.listdir(path):
+        bucket_path = os.path.join(path, name)
+        if os.path.exists(os.path.join(bucket_path, 'descriptor.json')):
+            bucket = six.moves.urllib.parse.unquote(name)
+            contents = read_json(os.path.join(bucket_path, 'descriptor.json'))
+            yield bucket, os.path.join(bucket_path, 'data'), contents
+
+
+def _read_parts(path):
+    # Parts of a bucket in the order they were written
+    if not os.path.isdir(path):
+        return []
+    numbers = sorted(int(name) for name in os.listdir(path) if name.isdigit())
+    return [read_dataframe(os.path.join(path, str(number)), mmap=True) for number in numbers]
+
+
+def _format_names(names):
+    if isinstance(names, list):
+        return ', '.join(names)
+    return names
+
+
+def _iter_chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _convert_chunk(mapper_options, descriptor, rows):
+    # Workers keep a mapper so compiled descriptors are reused across chunks
+    key = tuple(sorted(mapper_options.items()))
+    mapper = _WORKER_MAPPERS.get(key)
+    if mapper is None:
+        mapper = _WORKER_MAPPERS[key] = Mapper(**mapper_options)
+    return mapper.convert_descriptor_and_rows(descriptor, rows)
+
+
+def _append_keys(keys, index):
+    if not len(index):
+        return keys
+    try:
+        first = index[0]
+        last = keys['last']
+        monotonic = keys['monotonic'] and index.is_monotonic_increasing
+        if monotonic and last is not None:
+            monotonic = bool(last <= first)
+        # Strictly increasing keys are unique (duplicates stay forever)
+        unique = None
+        if keys['unique'] is False:
+            unique = False
+        elif monotonic and keys['unique'] and index.is_unique:
+            unique = last is None or bool(last < first)
+    except TypeError:
+        return None
+    return {'monotonic': monotonic, 'unique': unique, 'last': index[-1]}
+
+
+def _locate(index, keys, unique, monotonic):
+
+    # Unique keys (sorted ones are searched without building a hash table)
+    if unique:
+        if monotonic and not isinstance(index, pd.MultiIndex):
+            try:
+                positions = np.minimum(index.searchsorted(keys), len(index) - 1)
+                found = np.asarray(index.take(positions) == keys, dtype=bool)
+                return np.where(found, positions, -1)
+            except TypeError:
+                pass
+        return index.get_indexer(keys)
+
+    # Duplicated keys (looked up among first occurrences)
+    firsts = np.flatnonzero(~index.duplicated(keep='first'))
+    positions = index.take(firsts).get_indexer(keys)
+    return np.where(positions >= 0, firsts[positions], -1)
+
+
+def _is_writeable(dataframe):
+    # Columns converted from Arrow tables without copying wrap read-only buffers
+    for name in dataframe.columns:
+        array = dataframe[name].array
+        for attribute in ['_ndarray', '_data', '_mask', '_codes']:
+            values = getattr(array, attribute, None)
+            if isinstance(values, np.ndarray) and not values.flags.writeable:
+                return False
+    return True
+
+
+def _update_rows(dataframe, positions, values):
+    for number, name in enumerate(dataframe.columns):
+        column = dataframe[name]
+        new_column = values[name]
+
+        # Categoricals get new categories
+        if pdc.is_categorical_dtype(column.dtype):
+            if pdc.is_categorical_dtype(new_column.dtype):
+                categories = new_column.cat.categories
+            else:
+                categories = pd.Index(new_column.dropna().unique())
+            missing = categories.difference(column.cat.categories)
+            if len(missing):
+                dataframe[name] = column.cat.add_categories(missing)
+            new_column = np.asarray(new_column, dtype=object)
+
+        # Other columns are upcast the way appended ones are
+        else:
+            dtype = pd.concat([column.iloc[:0], new_column.iloc[:0]]).dtype
+            if dtype != column.dtype:
+                dataframe[name] = column.astype(dtype)
+            new_column = new_column.astype(dtype).array
+
+        dataframe.iloc[positions, number] = new_column
+
+
+def _compare(values, comparison, value):
+    values = pd.Series(np.asarray(values) if isinstance(values, pd.Index) else values.array)
+
+    # Nulls
+    if value is None and comparison in ('==', '!='):
+        result = values.isnull()
+        return np.asarray(result if comparison == '==' else ~result)
+
+    # Compacted floats are compared with values of their precision
+    if values.dtype.kind == 'f':
+        value = np.asarray(value, dtype=values.dtype)
+        value = value if comparison == 'in' else value[()]
+
+    # Values
+    if comparison == 'in':
+        return np.asarray(values.isin(value))
+    compare = _OPERATORS[comparison]
+    try:
+        result = compare(values, value)
+    except TypeError:
+        # Unordered categoricals and object columns having nulls are compared by values
+        values = values.astype(object)
+        notnull = values.notnull().values
+        result = np.zeros(len(values), dtype=bool)
+        result[notnull] = compare(values[notnull], value)
+    return np.asarray(pd.Series(result).fillna(False), dtype=bool)
+
+
+def _continue_ranges(data_frames):
+    # Rows of data frames converted from chunks are numbered as if converted at once
+    offset = 0
+    for data_frame in data_frames:
+        if isinstance(data_frame.index, pd.RangeIndex):
+            data_frame.index = pd.RangeIndex(offset, offset + len(data_frame))
+        offset += len(data_frame)
+    return data_frames
+
+
+class _ParserError(Exception):
+    pass
+
+
+class _ParquetFile(object):
+
+    # Public
+
+    def __init__(self, path):
+        self.__path = path
+        self.__writer = None
+
+    def write(self, table):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            message = 'Parquet export requires "pyarrow" package to be installed'
+            raise tableschema.exceptions.StorageError(message)
+        if self.__writer is None:
+            self.__writer = pq.ParquetWriter(self.__path, table.schema)
+        elif not table.schema.equals(self.__writer.schema):
+            # Chunks may differ in types inferred from their values
+            table = table.cast(self.__writer.schema)
+        self.__writer.write_table(table)
+
+    def close(self):
+        if self.__writer is not None:
+            self.__writer.close()
+
+
+def _has_unique_fields(descriptor):
+    return any(field.get('constraints', {}).get('unique') for field in descriptor['fields'])
+
+
+def _is_native_number(column):
+    # The C parser reads numbers the way plain number fields are cast
+    if column.field.type != 'number' or column.native_cast is None:
+        return False
+    return not set(['decimalChar', 'groupChar', 'bareNumber']) & set(column.field.descriptor)
+
+
+def _get_memory_usage(dataframe):
+    return int(dataframe.memory_usage(index=True, deep=False).sum())
+
+
+_WORKER_MAPPERS = {}
+
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Sides of searchsorted giving start and stop of a key range
+_RANGE_SIDES = {
+    '==': ('left', 'right'),
+    '<': (None, 'left'),
+    '<=': (None, 'right'),
+    '>': ('right', None),
+    '>=': ('left', None),
+}
+
+
+def _unify_categories(data_frames):
+    # Concatenated categoricals stay categoricals only having the same categories
+    for column in data_frames[0].columns:
+        series = [data_frame.get(column) for data_frame in data_frames]
+        if not all(pdc.is_categorical_dtype(item) for item in series):
+            continue
+        categories = [item.cat.categories for item in series]
+        if all(item.equals(categories[0]) for item in categories):
+            continue
+        categories = pd.Index(np.concatenate(categories)).unique()
+        for index, data_frame in enumerate(data_frames):
+            data_frame = data_frame.copy(deep=False)
+            data_frame[column] = data_frame[column].cat.set_categories(categories)
+            data_frames[index] = data_frame
+    return data_frames
@@ -6,11 +6,13 @@ from __future__ import unicode_literals
 
 import six
 import pytest
+import decimal
 import datetime
 import tableschema
 import numpy as np
 import pandas as pd
 from tableschema_pandas.mapper import Mapper
+from tableschema_pandas.stats import Stats
 
 
 # Tests
@@ -24,6 +26,55 @@ def test_mapper_convert_descriptor_and_rows():
     assert isinstance(df_new.index, pd.Index)
 
 
+def test_mapper_convert_descriptor_and_rows_mixed_values():
+    mapper = Mapper()
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'rating', 'type': 'number'},
+            {'name': 'current', 'type': 'boolean'},
+            {'name': 'created', 'type': 'datetime'},
+            {'name': 'stats', 'type': 'object'},
+        ],
+        'primaryKey': 'id',
+    }
+    rows = [
+        ['1', '9.5', 'true', '2015-01-01T03:00:00Z', '{"chars": 560}'],
+        [2, 7, False, datetime.datetime(2015, 1, 2), {'chars': 970}],
+        ['3', None, '0', '', '{"chars": 1}'],
+    ]
+    df = mapper.convert_descriptor_and_rows(descriptor, rows)
+    assert list(df.index) == [1, 2, 3]
+    assert df.dtypes.to_dict() == {
+        'rating': np.dtype(float),
+        'current': np.dtype(bool),
+        'created': np.dtype('datetime64[ns]'),
+        'stats': np.dtype('O'),
+    }
+    assert df['rating'].tolist()[:2] == [9.5, 7.0]
+    assert np.isnan(df['rating'].tolist()[2])
+    assert df['current'].tolist() == [True, False, False]
+    assert df['created'].tolist()[:2] == [
+        pd.Timestamp(2015, 1, 1, 3), pd.Timestamp(2015, 1, 2)]
+    assert pd.isnull(df['created'].tolist()[2])
+    assert df['stats'].tolist() == [{'chars': 560}, {'chars': 970}, {'chars': 1}]
+
+
+def test_mapper_convert_descriptor_and_rows_first_error():
+    mapper = Mapper()
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'current', 'type': 'boolean'},
+        ],
+    }
+    rows = [['1', 'true'], ['2', '{bad'], ['bad', 'true']]
+    # Second row's boolean fails before third row's integer
+    with pytest.raises(ValueError) as excinfo:
+        mapper.convert_descriptor_and_rows(descriptor, rows)
+    assert 'int()' not in str(excinfo.value)
+
+
 @pytest.mark.skip
 def test_mapper_convert_descriptor_and_rows_with_datetime_index():
     mapper = Mapper()
@@ -34,6 +85,37 @@ def test_mapper_convert_descriptor_and_rows_with_datetime_index():
     assert isinstance(df_new.index, pd.DatetimeIndex)
 
 
+def test_mapper_convert_descriptor_and_rows_with_composite_index():
+    mapper = Mapper()
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'created', 'type': 'datetime'},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': ['name', 'id'],
+    }
+    rows = [['1', '2015-01-01T03:00:00Z', 'a'], ['2', '2015-01-02T03:00:00Z', 'b']]
+    df = mapper.convert_descriptor_and_rows(descriptor, rows)
+    assert list(df.index) == [('a', 1), ('b', 2)]
+    assert df.index.names == ['name', 'id']
+    assert list(df.columns) == ['created']
+    keys = mapper.convert_keys(descriptor, [['b', '2'], ['c', 3]])
+    assert df.index.get_indexer(keys).tolist() == [1, -1]
+
+
+def test_mapper_compile_descriptor():
+    mapper = Mapper(cache_size=1)
+    descriptor1 = {'fields': [{'name': 'id', 'type': 'integer'}], 'primaryKey': 'id'}
+    descriptor2 = {'fields': [{'name': 'id', 'type': 'string'}]}
+    plan = mapper.compile_descriptor(descriptor1)
+    assert [column.name for column in plan.index_columns] == ['id']
+    assert plan.data_columns == []
+    assert mapper.compile_descriptor(dict(descriptor1)) is plan
+    assert mapper.compile_descriptor(descriptor2) is not plan
+    assert mapper.compile_descriptor(descriptor1) is not plan
+
+
 def test_mapper_convert_type():
     mapper = Mapper()
     assert mapper.convert_type('string') == np.dtype('O')
@@ -44,6 +126,101 @@ def test_mapper_convert_type():
         mapper.convert_type('non-existent')
 
 
+def test_mapper_convert_type_nullable():
+    mapper = Mapper(nullable=True)
+    assert mapper.convert_type('integer') == pd.Int64Dtype()
+    assert mapper.convert_type('boolean') == pd.BooleanDtype()
+    assert mapper.convert_type('string') == pd.StringDtype()
+    assert mapper.convert_type('number') == np.dtype(float)
+    assert mapper.restore_type(pd.Int64Dtype()) == 'integer'
+    assert mapper.restore_type(pd.BooleanDtype()) == 'boolean'
+    assert mapper.restore_type(pd.StringDtype()) == 'string'
+
+
+def test_mapper_convert_descriptor_and_rows_compact():
+    mapper = Mapper(compact=True, compact_floats=True)
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'small', 'type': 'integer'},
+            {'name': 'declared', 'type': 'integer',
+                'constraints': {'minimum': -1, 'maximum': 1000}},
+            {'name': 'number', 'type': 'number'},
+            {'name': 'year', 'type': 'year'},
+        ],
+        'primaryKey': 'id',
+    }
+    df = mapper.convert_descriptor_and_rows(descriptor, [['1', '1', '1', '0.1', '2000']])
+    assert df.dtypes.tolist() == [np.uint8, np.int16, np.float32, np.uint16]
+    assert df.index.dtype == np.int64
+    assert mapper.restore_descriptor(df)['fields'][1:] == [
+        {'name': 'small', 'type': 'integer'},
+        {'name': 'declared', 'type': 'integer'},
+        {'name': 'number', 'type': 'number'},
+        {'name': 'year', 'type': 'integer'},
+    ]
+    schema = mapper.compile_descriptor(descriptor).schema
+    assert list(mapper.restore_rows(df, schema)) == [[1, 1, 1, decimal.Decimal('0.1'), 2000]]
+
+
+def test_mapper_convert_descriptor_and_rows_json_interning():
+    mapper = Mapper()
+    descriptor = {
+        'fields': [
+            {'name': 'object', 'type': 'object'},
+            {'name': 'array', 'type': 'array'},
+        ],
+    }
+    rows = [['{"a": [1]}', '[1, 2]'], ['{"a": [1]}', ' [1, 2] '], ['', '[1, 2]']]
+    stats = Stats()
+    df1 = mapper.convert_descriptor_and_rows(descriptor, rows, stats=stats)
+    assert df1['object'].tolist() == [{'a': [1]}, {'a': [1]}, None]
+    assert df1['array'].tolist() == [[1, 2], [1, 2], [1, 2]]
+    assert df1['object'][0] is df1['object'][1]
+    assert df1['array'][0] is df1['array'][2]
+    assert stats.counters['json_decodes'] == 2
+    assert stats.counters['unique_casts'] == 2
+    df2 = mapper.convert_descriptor_and_rows(descriptor, rows[:1])
+    assert df2['object'][0] is not df1['object'][0]
+    mapper = Mapper(intern_size=10)
+    df1 = mapper.convert_descriptor_and_rows(descriptor, rows)
+    stats = Stats()
+    df2 = mapper.convert_descriptor_and_rows(descriptor, rows[:1], stats=stats)
+    assert df2['object'][0] is df1['object'][0]
+    assert stats.counters['json_interned'] == 2
+    assert stats.counters['json_decodes'] == 0
+
+
+def test_mapper_validate_dataframes():
+    mapper = Mapper(validate=True, native_temporal=True)
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'price', 'type': 'number', 'constraints': {'enum': ['1.5', '2']}},
+            {'name': 'name', 'type': 'string', 'constraints': {'maxLength': 3}},
+            {'name': 'created', 'type': 'datetime',
+                'constraints': {'maximum': '2020-01-01T00:00:00Z'}},
+            {'name': 'spent', 'type': 'duration', 'constraints': {'maximum': 'P1D'}},
+            {'name': 'stats', 'type': 'object', 'constraints': {'unique': True}},
+        ],
+        'primaryKey': 'id',
+    }
+    rows = [
+        ['1', '1.5', 'abc', '2019-01-01T00:00:00Z', 'PT1H', '{"a": 1}'],
+        ['2', '3', 'abcd', '2021-01-01T00:00:00Z', 'P2D', '{"a": 2}'],
+    ]
+    df = mapper.convert_descriptor_and_rows(descriptor, rows)
+    assert mapper.validate_dataframes(descriptor, [df.iloc[:1]]) == []
+    assert mapper.validate_dataframes(descriptor, [df], previous=[df.iloc[1:]]) == [
+        {'field': 'price', 'constraint': 'enum', 'rows': [1]},
+        {'field': 'name', 'constraint': 'maxLength', 'rows': [1]},
+        {'field': 'created', 'constraint': 'maximum', 'rows': [1]},
+        {'field': 'spent', 'constraint': 'maximum', 'rows': [1]},
+        {'field': 'stats', 'constraint': 'unique', 'rows': [1]},
+        {'field': ['id'], 'constraint': 'primaryKey', 'rows': [1]},
+    ]
+
+
 def test_mapper_restore_descriptor():
     mapper = Mapper()
     df = pd.read_csv('data/sample.csv', sep=';', index_col=['Id'])
@@ -59,6 +236,47 @@ def test_mapper_restore_descriptor():
      }
 
 
+def test_mapper_restore_descriptor_infer_constraints():
+    mapper = Mapper(infer_constraints=True)
+    df = pd.DataFrame({
+        'mixed': [1, 'a', None],
+        'numbers': [1, 2.5, None],
+        'objects': [{'a': 1}, {'a': 1}, {'a': 2}],
+        'strings': [None, None, 'a'],
+        'unique': ['a', 'b', 'c'],
+    }, columns=['mixed', 'numbers', 'objects', 'strings', 'unique'], dtype=object)
+    descriptor = mapper.restore_descriptor(df)
+    assert descriptor == {
+        'fields': [
+            {'name': 'mixed', 'type': 'any', 'constraints': {'unique': True}},
+            {'name': 'numbers', 'type': 'number', 'constraints': {'unique': True}},
+            {'name': 'objects', 'type': 'object', 'constraints': {'required': True}},
+            {'name': 'strings', 'type': 'string', 'constraints': {'unique': True}},
+            {'name': 'unique', 'type': 'string', 'constraints': {'required': True, 'unique': True}},
+        ],
+    }
+
+
+def test_mapper_restore_descriptor_arrow_schema():
+    pa = pytest.importorskip('pyarrow')
+    mapper = Mapper()
+    df = pd.read_csv('data/sample.csv', sep=';', index_col=['Id'])
+    df['Col4'] = pd.to_datetime('2020-01-01')
+    df['Col5'] = pd.Categorical(['a'] * len(df))
+    descriptor = mapper.restore_descriptor(pa.Table.from_pandas(df).schema)
+    assert descriptor == {
+        'fields': [
+            {'name': 'Id', 'type': 'integer', 'constraints': {'required': True}},
+            {'name': 'Col1', 'type': 'number'},
+            {'name': 'Col2', 'type': 'number'},
+            {'name': 'Col3', 'type': 'number'},
+            {'name': 'Col4', 'type': 'datetime'},
+            {'name': 'Col5', 'type': 'string'},
+        ],
+        'primaryKey': 'Id',
+     }
+
+
 def test_mapper_restore_type():
     mapper = Mapper()
     df = pd.DataFrame([{
@@ -5,11 +5,15 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import io
+import os
 import six
 import json
 import pytest
+import isodate
 import datetime
+import threading
 import tableschema
+import numpy as np
 import pandas as pd
 from copy import deepcopy
 from decimal import Decimal
@@ -264,6 +268,83 @@ def test_storage_multiple_writes():
     ]
 
 
+def test_storage_multiple_writes_consolidate_threshold():
+    schema = {
+        'fields': [
+            {'name': 'key', 'type': 'integer'},
+            {'name': 'value', 'type': 'string'},
+        ],
+        'primaryKey': 'key',
+    }
+    storage = Storage(consolidate_threshold=3)
+    storage.create('data', schema)
+    for key in range(7):
+        storage.write('data', [(key, 'x%s' % key)])
+    assert list(storage['data'].index) == list(range(7))
+    assert storage.read('data') == [[key, 'x%s' % key] for key in range(7)]
+    storage.write('data', [(7, 'x7')])
+    assert storage.read('data')[-1] == [7, 'x7']
+
+
+def test_storage_iter_batches():
+    schema = {
+        'fields': [
+            {'name': 'key', 'type': 'integer'},
+            {'name': 'value', 'type': 'string'},
+        ],
+        'primaryKey': 'key',
+    }
+    data = [[key, 'x%s' % key] for key in range(5)]
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', data)
+    batches = list(storage.iter_batches('data', batch_size=2))
+    assert batches == [data[0:2], data[2:4], data[4:5]]
+    frames = list(storage.iter_batches('data', batch_size=2, as_frame=True))
+    assert [len(frame) for frame in frames] == [2, 2, 1]
+    assert list(frames[1].index) == [2, 3]
+    assert list(storage.iter('data')) == storage.read('data') == data
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.iter_batches('data', batch_size=0)
+
+
+def test_storage_nullable():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'parent', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'current', 'type': 'boolean'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(nullable=True)
+    storage.create('data', schema)
+    storage.write('data', [
+        ['1', '', 'Taxes', 'True'],
+        ['2', str(2 ** 53 + 1), '', ''],
+    ])
+    assert storage['data'].dtypes.astype(str).to_dict() == {
+        'parent': 'Int64',
+        'name': 'string',
+        'current': 'boolean',
+    }
+    assert storage.read('data') == [
+        [1, None, 'Taxes', True],
+        [2, 2 ** 53 + 1, None, None],
+    ]
+    storage = Storage(dataframes={'data': storage['data']})
+    assert storage.describe('data') == {
+        'fields': [
+            {'name': 'id', 'type': 'integer', 'constraints': {'required': True}},
+            {'name': 'parent', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'current', 'type': 'boolean'},
+        ],
+        'primaryKey': 'id',
+    }
+
+
 def test_storage_composite_primary_key():
     schema = {
         'fields': [
@@ -278,6 +359,830 @@ def test_storage_composite_primary_key():
     storage.create('bucket', schema)
     storage.write('bucket', data)
     assert storage['bucket'].to_dict() == {'field3': {('value1', 'value2'): 'value3'}}
+    assert storage.read('bucket') == data
+
+
+def test_storage_read_restored_values():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'parent', 'type': 'integer'},
+            {'name': 'rating', 'type': 'number'},
+            {'name': 'created', 'type': 'datetime'},
+            {'name': 'current', 'type': 'boolean'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', [
+        ['1', '', '9.5', '2015-01-01T03:00:00Z', 'true'],
+        ['2', '1', '7', '2015-12-31T15:45:33Z', 'false'],
+    ])
+    rows = storage.read('data')
+    assert rows == [
+        [1, None, Decimal('9.5'), datetime.datetime(2015, 1, 1, 3), True],
+        [2, 1, Decimal('7.0'), datetime.datetime(2015, 12, 31, 15, 45, 33), False],
+    ]
+    assert [list(map(type, row)) for row in rows] == [
+        [int, type(None), Decimal, datetime.datetime, bool],
+        [int, int, Decimal, datetime.datetime, bool],
+    ]
+
+
+def test_storage_read_json_values_are_copies():
+    schema = {'fields': [{'name': 'id', 'type': 'integer'}, {'name': 'meta', 'type': 'object'}]}
+    storage = Storage()
+    storage.create(['a', 'b'], [schema, schema])
+    storage.write('a', [['1', '{"x": 1}'], ['2', '{"x": 1}']])
+    # Rows having the same JSON string don't share restored values
+    storage.read('a')[0][1]['evil'] = True
+    rows = storage.read('a')
+    rows[0][1]['evil'] = True
+    assert rows[1][1] == {'x': 1}
+    assert storage.read('a') == [[1, {'x': 1}], [2, {'x': 1}]]
+    storage.write('b', [['1', '{"x": 1}']])
+    assert storage.read('b') == [[1, {'x': 1}]]
+
+
+def test_storage_categorical():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'kind', 'type': 'string', 'constraints': {'enum': ['a', 'b', 'c']}},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(categorical_threshold=0.5)
+    storage.create('data', schema)
+    storage.write('data', [['1', 'a', 'x'], ['2', 'b', 'x'], ['3', 'a', 'x']])
+    storage.write('data', [['4', 'c', 'y'], ['5', 'c', 'y'], ['6', 'c', 'y']])
+    dataframe = storage['data']
+    assert dataframe['kind'].cat.categories.tolist() == ['a', 'b', 'c']
+    assert dataframe['name'].cat.categories.tolist() == ['x', 'y']
+    assert storage.read('data') == [
+        [1, 'a', 'x'], [2, 'b', 'x'], [3, 'a', 'x'],
+        [4, 'c', 'y'], [5, 'c', 'y'], [6, 'c', 'y'],
+    ]
+    storage = Storage(dataframes={'data': dataframe})
+    assert storage.describe('data')['fields'][1] == {
+        'name': 'kind', 'type': 'string', 'constraints': {'enum': ['a', 'b', 'c']},
+    }
+
+
+def test_storage_write_workers():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'parent', 'type': 'integer'},
+        ],
+        'primaryKey': ['id', 'name'],
+    }
+    data = [[str(index), 'name%s' % (index % 3), str(index) if index % 5 else '']
+            for index in range(20)]
+    serial = Storage()
+    serial.create('data', schema)
+    serial.write('data', data)
+    parallel = Storage(workers=2, chunk_size=3)
+    parallel.create('data', schema)
+    parallel.write('data', iter(data))
+    assert parallel['data'].equals(serial['data'])
+    assert parallel['data'].index.equals(serial['data'].index)
+    assert parallel.read('data') == serial.read('data')
+    with pytest.raises(ValueError):
+        parallel.write('data', data + [['bad', 'name', '1']])
+    assert len(parallel['data']) == 20
+
+
+def test_storage_write_workers_categorical():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+        ],
+    }
+    # The first chunk has only distinct names
+    data = [[str(index), 'name%s' % (index if index < 3 else index % 2)] for index in range(20)]
+    serial = Storage(categorical_threshold=0.5)
+    serial.create('data', schema)
+    serial.write('data', data)
+    parallel = Storage(categorical_threshold=0.5, workers=2, chunk_size=3)
+    parallel.create('data', schema)
+    parallel.write('data', data)
+    assert parallel['data'].dtypes.equals(serial['data'].dtypes)
+    assert parallel['data'].equals(serial['data'])
+    assert parallel.read('data') == serial.read('data')
+
+
+def test_storage_write_workers_single_chunk(monkeypatch):
+    def pool(*args, **kwargs):
+        raise AssertionError('A pool is started')
+    monkeypatch.setattr('multiprocessing.Pool', pool)
+    storage = Storage(workers=2, chunk_size=3)
+    storage.create('data', {'fields': [{'name': 'id', 'type': 'integer'}]})
+    storage.write('data', [['1'], ['2'], ['3']])
+    storage.write('data', [])
+    assert storage.read('data') == [[1], [2], [3]]
+
+
+def test_storage_path(tmpdir):
+    path = str(tmpdir.join('storage'))
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'object', 'type': 'object'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(path=path, memory_budget=1)
+    storage.create(['bucket1', 'bucket/2'], [schema, schema])
+    storage.write('bucket1', [['1', 'a', '{"a": 1}']])
+    storage.write('bucket/2', [['1', 'b', '{"b": 1}']])
+    storage.write('bucket1', [['2', 'c', '{"c": 1}']])
+    assert storage.read('bucket1') == [[1, 'a', {'a': 1}], [2, 'c', {'c': 1}]]
+    assert storage.read('bucket/2') == [[1, 'b', {'b': 1}]]
+    storage = Storage(path=path)
+    assert storage.buckets == ['bucket/2', 'bucket1']
+    assert storage.describe('bucket1') == schema
+    assert storage.read('bucket1') == [[1, 'a', {'a': 1}], [2, 'c', {'c': 1}]]
+    storage.delete('bucket1')
+    assert Storage(path=path).buckets == ['bucket/2']
+
+
+def test_storage_path_write_without_read(tmpdir):
+    path = str(tmpdir.join('storage'))
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(path=path)
+    storage.create('bucket', schema)
+    storage.write('bucket', [['1', 'a'], ['2', 'b']])
+    storage.write('bucket', [['3', 'c']])
+    storage.write('bucket', [['3', 'C']], mode='upsert')
+    # Written rows are persisted without reading the bucket first
+    storage = Storage(path=path)
+    assert storage.read('bucket') == [[1, 'a'], [2, 'b'], [3, 'C']]
+    storage.write('bucket', [['4', 'd']])
+    assert Storage(path=path).read('bucket') == [[1, 'a'], [2, 'b'], [3, 'C'], [4, 'd']]
+    # Parts are merged into the bucket files on consolidation
+    assert sorted(os.listdir(os.path.join(path, 'bucket'))) == ['data', 'descriptor.json']
+
+
+def test_storage_path_upsert_with_pending_parts(tmpdir):
+    path = str(tmpdir.join('storage'))
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(path=path)
+    storage.create('bucket', schema)
+    storage.write('bucket', [['1', 'x']])
+    storage.read('bucket')
+    storage.write('bucket', [['2', 'y']])
+    # Updating the bucket files keeps parts still pending
+    storage.write('bucket', [['1', 'X']], mode='upsert')
+    assert Storage(path=path).read('bucket') == [[1, 'X'], [2, 'y']]
+
+
+def test_storage_save_and_open(tmpdir):
+    path = str(tmpdir.join('snapshot'))
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string', 'constraints': {'enum': ['a', 'b']}},
+            {'name': 'value', 'type': 'integer'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(nullable=True)
+    storage.create('bucket/1', schema)
+    storage.write('bucket/1', [['1', 'a', '1'], ['2', 'b', None]])
+    storage.write('bucket/1', [['3', 'a', '3']])
+    storage.create('empty', {'fields': [{'name': 'id', 'type': 'integer'}]})
+    storage.save(path)
+    storage.save(path)
+    for mmap in [True, False]:
+        opened = Storage.open(path, mmap=mmap)
+        assert opened.buckets == ['bucket/1', 'empty']
+        assert opened.describe('bucket/1') == schema
+        assert opened.read('bucket/1') == [[1, 'a', 1], [2, 'b', None], [3, 'a', 3]]
+        assert opened['bucket/1'].dtypes.tolist() == storage['bucket/1'].dtypes.tolist()
+        assert opened.read('empty') == []
+    # Changes aren't written back
+    opened = Storage.open(path)
+    opened.write('bucket/1', [['1', 'b', '10']], mode='upsert')
+    assert opened.read('bucket/1')[0] == [1, 'b', 10]
+    assert Storage.open(path).read('bucket/1')[0] == [1, 'a', 1]
+    with pytest.raises(tableschema.exceptions.StorageError):
+        Storage.open(str(tmpdir.join('missing')))
+
+
+def test_storage_arrow():
+    pa = pytest.importorskip('pyarrow')
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'created', 'type': 'datetime'},
+            {'name': 'kind', 'type': 'string', 'constraints': {'enum': ['a', 'b']}},
+            {'name': 'parent', 'type': 'integer'},
+            {'name': 'object', 'type': 'object'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create(['bucket1', 'bucket2'], [schema, schema])
+    storage.write('bucket1', [
+        ['1', '2015-01-01T03:00:00Z', 'a', '', '{"a": 1}'],
+        ['2', '2015-12-31T15:45:33Z', 'b', '1', '{"a": 2}'],
+    ])
+    table = storage.to_arrow('bucket1')
+    assert table.column_names == ['id', 'created', 'kind', 'parent', 'object']
+    assert table.schema.field('created').type == pa.timestamp('ns')
+    assert table.column('parent').to_pylist() == [None, 1]
+    storage.write_arrow('bucket2', table)
+    assert storage['bucket2'].equals(storage['bucket1'])
+    assert storage.read('bucket2') == storage.read('bucket1')
+
+
+def test_storage_arrow_empty():
+    pa = pytest.importorskip('pyarrow')
+    storage = Storage()
+    storage.create('data', {
+        'fields': [{'name': 'id', 'type': 'integer'}, {'name': 'name', 'type': 'string'}],
+        'primaryKey': 'id',
+    })
+    table = storage.to_arrow('data')
+    assert table.num_rows == 0
+    assert table.schema.field('id').type == pa.int64()
+    assert table.schema.field('name').type == pa.string()
+
+
+def test_storage_write_arrow_and_upsert():
+    pa = pytest.importorskip('pyarrow')
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'value', 'type': 'number'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write_arrow('data', pa.table({'id': [1, 2], 'value': [1.5, 2.5]}))
+    # Pending data frame wraps read-only Arrow buffers
+    storage.write('data', [['2', '3.5']], mode='upsert')
+    assert storage.read('data') == [[1, Decimal('1.5')], [2, Decimal('3.5')]]
+    storage.write_arrow('data', pa.table({'id': [3], 'value': [4.5]}))
+    storage['data']
+    storage.write('data', [['3', '5.5']], mode='upsert')
+    assert storage.read('data')[2] == [3, Decimal('5.5')]
+
+
+def test_storage_describe_cached():
+    dataframe = pd.DataFrame({'name': ['a', 'b']}, index=pd.Index([1, 2], name='id'))
+    storage = Storage(dataframes={'data': dataframe}, infer_constraints=True)
+    descriptor = storage.describe('data')
+    assert descriptor['fields'][1] == {
+        'name': 'name', 'type': 'string', 'constraints': {'required': True, 'unique': True},
+    }
+    descriptor['fields'][1]['type'] = 'integer'
+    assert storage.describe('data')['fields'][1]['type'] == 'string'
+    storage.write('data', [['3', 'a']])
+    assert storage.describe('data')['fields'][1] == {
+        'name': 'name', 'type': 'string', 'constraints': {'required': True},
+    }
+
+
+def test_storage_compact():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'count', 'type': 'integer'},
+            {'name': 'delta', 'type': 'integer'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(compact=True, consolidate_threshold=1)
+    storage.create('data', schema)
+    storage.write('data', [['1', '10', '-1']])
+    assert storage['data'].dtypes.tolist() == [np.uint8, np.int8]
+    storage.write('data', [['2', '100000', None]])
+    assert storage['data'].dtypes.tolist() == [np.uint32, np.float64]
+    assert storage.read('data') == [[1, 10, -1], [2, 100000, None]]
+
+
+def test_storage_native_temporal(tmpdir):
+    schema = {
+        'fields': [
+            {'name': 'day', 'type': 'date', 'format': '%d/%m/%Y'},
+            {'name': 'created', 'type': 'datetime'},
+            {'name': 'time', 'type': 'time'},
+            {'name': 'duration', 'type': 'duration'},
+            {'name': 'month', 'type': 'yearmonth'},
+        ],
+        'primaryKey': 'day',
+    }
+    storage = Storage(path=str(tmpdir.join('storage')), native_temporal=True)
+    storage.create('data', schema)
+    storage.write('data', [
+        ['01/02/2015', '2015-01-01T03:00:00Z', '10:30:00', 'P1DT2H', '2015-02'],
+        [datetime.date(2015, 2, 2), None, datetime.time(1, 2, 3), 'PT5S', [2015, 3]],
+    ])
+    storage.write('data', [['3/2/2015', '', '', 'P1M', '']])
+    assert storage['data'].index.dtype == np.dtype('datetime64[ns]')
+    assert storage['data'].dtypes.astype(str).to_dict() == {
+        'created': 'datetime64[ns, UTC]',
+        'time': 'timedelta64[ns]',
+        'duration': 'object',
+        'month': 'period[M]',
+    }
+    data = [
+        [datetime.date(2015, 2, 1), pd.Timestamp('2015-01-01T03:00:00Z').to_pydatetime(),
+            datetime.time(10, 30), datetime.timedelta(days=1, hours=2), (2015, 2)],
+        [datetime.date(2015, 2, 2), None,
+            datetime.time(1, 2, 3), datetime.timedelta(seconds=5), (2015, 3)],
+        [datetime.date(2015, 2, 3), None, None, isodate.Duration(months=1), None],
+    ]
+    assert storage.read('data') == data
+    assert storage.read('data', where=[('day', '>=', '02/02/2015')]) == data[1:]
+    assert Storage(path=str(tmpdir.join('storage'))).read('data') == data
+    storage.export('data', str(tmpdir.join('data.csv')))
+    assert tmpdir.join('data.csv').read().splitlines()[:2] == [
+        'day,created,time,duration,month',
+        '01/02/2015,2015-01-01T03:00:00Z,10:30:00,P1DT2H,2015-02',
+    ]
+    with pytest.raises(tableschema.exceptions.CastError):
+        storage.write('data', [['01/01/1500', '', '', '', '']])
+
+
+def test_storage_iter_fields_and_where():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'kind', 'type': 'string', 'constraints': {'enum': ['a', 'b']}},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', [[1, 'x', 'a'], [2, None, 'b'], [3, 'z', 'b'], [4, 'w', 'a']])
+    assert list(storage.iter('data', fields=['name', 'id'], where=[('id', '>=', '2')])) == [
+        [None, 2], ['z', 3], ['w', 4],
+    ]
+    assert storage.read('data', fields=['id'], where=[('name', '==', None)]) == [[2]]
+    assert storage.read('data', fields=['id'], where=[('name', '<', 'y')]) == [[1], [4]]
+    assert storage.read('data', where=[('kind', '==', 'b'), ('id', 'in', [1, 3])]) == [
+        [3, 'z', 'b'],
+    ]
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.read('data', fields=['non-existent'])
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.read('data', where=[('id', 'like', 1)])
+    with pytest.raises(tableschema.exceptions.StorageError) as excinfo:
+        storage.read('data', where=[('id', '==', 'x')])
+    assert str(excinfo.value) == 'Value "x" can\'t be cast to field "id"'
+    storage.create('meta', {'fields': [{'name': 'meta', 'type': 'object'}]})
+    with pytest.raises(tableschema.exceptions.StorageError) as excinfo:
+        storage.read('meta', where=[('meta', '==', '{bad')])
+    assert str(excinfo.value) == 'Value "{bad" can\'t be cast to field "meta"'
+    with pytest.raises(tableschema.exceptions.StorageError) as excinfo:
+        list(storage.iter('data', fields=['name', 'name']))
+    assert '"name"' in str(excinfo.value)
+
+
+def test_storage_iter_where_compact_floats():
+    storage = Storage(compact_floats=True)
+    storage.create('data', {'fields': [{'name': 'value', 'type': 'number'}]})
+    storage.write('data', [['0.1'], ['0.2'], ['0.3']])
+    assert storage['data'].dtypes.tolist() == [np.float32]
+    assert storage.read('data', where=[('value', 'in', [0.1, 0.3])]) == [
+        [Decimal('0.1')], [Decimal('0.3')],
+    ]
+    assert storage.read('data', where=[('value', '==', '0.2')]) == [[Decimal('0.2')]]
+    assert storage.read('data', where=[('value', '<=', 0.2)]) == [
+        [Decimal('0.1')], [Decimal('0.2')],
+    ]
+
+
+def test_storage_load_csv():
+    descriptor = {
+        'fields': [
+            {'name': 'Date', 'type': 'datetime'},
+            {'name': 'VIXClose', 'type': 'number'},
+            {'name': 'VIXHigh', 'type': 'number'},
+            {'name': 'VIXLow', 'type': 'number'},
+            {'name': 'VIXOpen', 'type': 'number'},
+        ],
+        'primaryKey': 'Date',
+    }
+    storage = Storage()
+    storage.load_csv('vix', 'data/vix.csv', descriptor, chunk_size=10, sep=';')
+    with Stream('data/vix.csv', headers=1) as stream:
+        storage.create('written', descriptor)
+        storage.write('written', stream)
+    assert storage['vix'].equals(storage['written'])
+    assert storage['vix'].dtypes.equals(storage['written'].dtypes)
+    assert storage.read('vix') == storage.read('written')
+
+
+def test_storage_load_csv_fallback(tmpdir):
+    path = str(tmpdir.join('data.csv'))
+    with io.open(path, 'w', encoding='utf-8') as file:
+        file.write('name,value\na,1.5\nb,\nc,nan\n')
+    storage = Storage()
+    storage.create('data', {'fields': [
+        {'name': 'value', 'type': 'number'},
+        {'name': 'name', 'type': 'string'},
+    ]})
+    storage.load_csv('data', path, chunk_size=2)
+    assert storage['data'].index.tolist() == [0, 1, 2]
+    assert storage.read('data')[:2] == [[Decimal('1.5'), 'a'], [None, 'b']]
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.load_csv('non-existent', path)
+
+
+def test_storage_export(tmpdir):
+    descriptor = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'flag', 'type': 'boolean', 'trueValues': ['Y'], 'falseValues': ['N']},
+            {'name': 'date', 'type': 'date'},
+            {'name': 'meta', 'type': 'object'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create('data', descriptor)
+    storage.write('data', [['1', 'Y', '2020-01-02', '{"a": 1}'], ['2', 'N', None, None]])
+    csv_path = str(tmpdir.join('data.csv'))
+    json_path = str(tmpdir.join('data.json'))
+    descriptor_path = str(tmpdir.join('datapackage.json'))
+    storage.export('data', csv_path, chunk_size=1, descriptor_path=descriptor_path)
+    storage.export('data', json_path, format='json')
+    with io.open(csv_path, encoding='utf-8') as file:
+        assert file.read().splitlines() == [
+            'id,flag,date,meta',
+            '1,Y,2020-01-02,"{""a"": 1}"',
+            '2,N,,',
+        ]
+    with io.open(json_path, encoding='utf-8') as file:
+        assert list(map(json.loads, file)) == [
+            {'id': 1, 'flag': True, 'date': '2020-01-02', 'meta': {'a': 1}},
+            {'id': 2, 'flag': False, 'date': None, 'meta': None},
+        ]
+    with io.open(descriptor_path, encoding='utf-8') as file:
+        assert json.load(file) == descriptor
+    storage.create('loaded', descriptor)
+    storage.load_csv('loaded', csv_path)
+    assert storage.read('loaded') == storage.read('data')
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.export('data', csv_path, format='xml')
+
+
+def test_storage_export_json_infinity(tmpdir):
+    path = str(tmpdir.join('data.json'))
+    storage = Storage(compact_floats=True)
+    storage.create('data', {'fields': [{'name': 'value', 'type': 'number'}]})
+    storage.write('data', [['inf'], ['-inf'], ['1.5'], [None]])
+    storage.export('data', path, format='json')
+
+    # JSON has no infinities (`json.loads` would accept them)
+    def parse_constant(name):
+        raise ValueError(name)
+
+    with io.open(path, encoding='utf-8') as file:
+        assert [json.loads(line, parse_constant=parse_constant) for line in file] == [
+            {'value': None}, {'value': None}, {'value': 1.5}, {'value': None},
+        ]
+
+
+def test_storage_export_parquet(tmpdir):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmpdir.join('data.parquet'))
+    storage = Storage()
+    storage.create('data', {'fields': [
+        {'name': 'id', 'type': 'integer'},
+        {'name': 'name', 'type': 'string'},
+    ]})
+    storage.export('data', path, format='parquet')
+    assert pq.read_table(path).num_rows == 0
+    storage.write('data', [['1', 'a'], ['2', None], ['3', 'c']])
+    storage.export('data', path, format='parquet', chunk_size=2)
+    assert pq.read_table(path).to_pydict() == {'id': [1, 2, 3], 'name': ['a', None, 'c']}
+
+
+def test_storage_export_parquet_untyped_fields(tmpdir):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmpdir.join('data.parquet'))
+    storage = Storage()
+    storage.create('data', {'fields': [
+        {'name': 'point', 'type': 'geopoint'},
+        {'name': 'object', 'type': 'object'},
+        {'name': 'array', 'type': 'array'},
+        {'name': 'any', 'type': 'any'},
+    ]})
+    storage.write('data', [
+        ['10,20', '{"a": 1}', '[1]', 'x'],
+        [None, None, None, None],
+        ['30,40', '{"b": [2]}', '["a"]', '5'],
+    ])
+    # Every chunk gets the same schema whatever its values are
+    storage.export('data', path, format='parquet', chunk_size=1)
+    table = pq.read_table(path)
+    assert table.to_pydict() == {
+        'point': [[10.0, 20.0], None, [30.0, 40.0]],
+        'object': ['{"a": 1}', None, '{"b": [2]}'],
+        'array': ['[1]', None, '["a"]'],
+        'any': ['x', None, '5'],
+    }
+    storage.create('copy', storage.describe('data'))
+    storage.write_arrow('copy', table)
+    assert [row[1:3] for row in storage.read('copy')] == [
+        [{'a': 1}, [1]], [None, None], [{'b': [2]}, ['a']]]
+
+
+def test_storage_get():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', [['1', 'a'], ['3', 'c']])
+    storage.write('data', [['5', 'e']])
+    assert storage.get('data', 3) == [3, 'c']
+    assert storage.get('data', '5') == [5, 'e']
+    assert storage.get('data', 2) is None
+    storage.write('data', [['2', 'b'], ['3', 'd']])
+    assert storage.get_many('data', [3, 2, 4]) == [[3, 'c'], [2, 'b'], None]
+
+
+def test_storage_get_composite_key():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'value', 'type': 'number'},
+        ],
+        'primaryKey': ['name', 'id'],
+    }
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', [['1', 'b', '1.5'], ['2', 'a', '2.5']])
+    assert storage.get('data', ['a', 2]) == [2, 'a', Decimal('2.5')]
+    assert storage.get_many('data', [('b', 1), ('b', 2)]) == [[1, 'b', Decimal('1.5')], None]
+
+
+def test_storage_get_without_primary_key():
+    storage = Storage(dataframes={'data': pd.DataFrame({'name': ['a']})})
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.get('data', 0)
+
+
+def test_storage_write_upsert_and_ignore():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+            {'name': 'value', 'type': 'integer'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(categorical_threshold=0.9)
+    storage.create('data', schema)
+    storage.write('data', [['1', 'a', '1'], ['2', 'b', '2']])
+    storage['data']
+    storage.write('data', [['3', 'c', '3']])
+    storage.write('data', [['2', 'B', None], ['4', 'd', '4'], ['4', 'D', '40'], ['3', 'C', '30']],
+                  mode='upsert')
+    storage.write('data', [['1', 'x', '0'], ['5', 'e', '5'], ['5', 'E', '50']], mode='ignore')
+    assert storage.read('data') == [
+        [1, 'a', 1], [2, 'B', None], [3, 'C', 30], [4, 'D', 40], [5, 'e', 5]]
+    assert storage['data'].index.is_unique
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.write('data', [], mode='replace')
+    storage.create('nokey', {'fields': [{'name': 'id', 'type': 'integer'}]})
+    with pytest.raises(tableschema.exceptions.StorageError):
+        storage.write('nokey', [['1']], mode='upsert')
+
+
+def test_storage_validate():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'age', 'type': 'integer', 'constraints': {'minimum': 0, 'required': True}},
+            {'name': 'name', 'type': 'string',
+                'constraints': {'unique': True, 'enum': ['a', 'b', 'c', 'd']}},
+            {'name': 'code', 'type': 'string', 'constraints': {'pattern': '[a-z]+'}},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(validate=True)
+    storage.create('data', schema)
+    storage.write('data', [['1', '10', 'a', 'x'], ['2', '20', 'b', 'y']])
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [
+            ['3', '-1', 'c', 'z'],
+            ['2', '', 'a', 'Z'],
+            ['4', '-5', 'e', 'w'],
+        ])
+    assert excinfo.value.errors == [
+        {'field': 'age', 'constraint': 'required', 'rows': [1]},
+        {'field': 'age', 'constraint': 'minimum', 'rows': [0, 2]},
+        {'field': 'name', 'constraint': 'unique', 'rows': [1]},
+        {'field': 'name', 'constraint': 'enum', 'rows': [2]},
+        {'field': 'code', 'constraint': 'pattern', 'rows': [1]},
+        {'field': ['id'], 'constraint': 'primaryKey', 'rows': [1]},
+    ]
+    assert storage.read('data') == [[1, 10, 'a', 'x'], [2, 20, 'b', 'y']]
+    # Only the kept row of a key is checked
+    storage.write('data', [['2', '-1', 'c', 'y'], ['2', '30', 'c', 'y']], mode='upsert')
+    assert storage.read('data') == [[1, 10, 'a', 'x'], [2, 30, 'c', 'y']]
+    assert storage.validate('data') == []
+    # Unique values are compared with stored rows that aren't replaced
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [['2', '30', 'b', 'y'], ['3', '40', 'a', 'z']], mode='upsert')
+    assert excinfo.value.errors == [{'field': 'name', 'constraint': 'unique', 'rows': [1]}]
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [['1', '-1', 'c', 'x'], ['3', '40', 'c', 'z']], mode='ignore')
+    assert excinfo.value.errors == [{'field': 'name', 'constraint': 'unique', 'rows': [1]}]
+    storage.write('data', [['1', '10', 'a', 'x'], ['3', '40', 'b', 'z']], mode='ignore')
+    assert storage.validate('data') == []
+    storage = Storage()
+    storage.create('data', schema)
+    storage.write('data', [['1', '10', 'a', 'x'], ['1', '20', 'a', 'y']])
+    assert storage.validate('data') == [
+        {'field': 'name', 'constraint': 'unique', 'rows': [1]},
+        {'field': ['id'], 'constraint': 'primaryKey', 'rows': [1]},
+    ]
+
+
+def test_storage_validate_integer_key_null():
+    storage = Storage(validate=True)
+    storage.create('data', {
+        'fields': [{'name': 'id', 'type': 'integer'}, {'name': 'name', 'type': 'string'}],
+        'primaryKey': 'id',
+    })
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [['1', 'a'], ['', 'b']])
+    assert excinfo.value.errors == [{'field': ['id'], 'constraint': 'primaryKey', 'rows': [1]}]
+    assert storage.read('data') == []
+
+
+def test_storage_validate_compact():
+    schema = {
+        'fields': [
+            {'name': 'value', 'type': 'integer', 'constraints': {'minimum': 0, 'maximum': 200}},
+        ],
+    }
+    storage = Storage(compact=True, validate=True)
+    storage.create('data', schema)
+    # Out of range values don't wrap around in the compact dtype
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [['300'], ['-1'], ['5']])
+    assert excinfo.value.errors == [
+        {'field': 'value', 'constraint': 'minimum', 'rows': [1]},
+        {'field': 'value', 'constraint': 'maximum', 'rows': [0]},
+    ]
+    storage.write('data', [['5'], ['200']])
+    assert storage['data'].dtypes.tolist() == [np.uint8]
+    assert storage.read('data') == [[5], [200]]
+
+
+def test_storage_validate_compact_floats():
+    schema = {
+        'fields': [
+            {'name': 'value', 'type': 'number',
+                'constraints': {'enum': [0.1, 0.3], 'maximum': 0.3}},
+        ],
+    }
+    storage = Storage(compact=True, compact_floats=True, validate=True)
+    storage.create('data', schema)
+    # Float32 values are checked against float32 constraints
+    storage.write('data', [['0.1'], ['0.3']])
+    assert storage['data'].dtypes.tolist() == [np.float32]
+    with pytest.raises(tableschema.exceptions.ValidationError) as excinfo:
+        storage.write('data', [['0.2'], ['0.4']])
+    assert excinfo.value.errors == [
+        {'field': 'value', 'constraint': 'maximum', 'rows': [1]},
+        {'field': 'value', 'constraint': 'enum', 'rows': [0, 1]},
+    ]
+
+
+@pytest.mark.skipif(six.PY2, reason='asyncio is not supported')
+def test_storage_async():
+    import asyncio
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string'},
+        ],
+        'primaryKey': 'id',
+    }
+    rows = [[index, 'name%s' % index] for index in range(25)]
+    storage = Storage()
+    storage.create('data', schema)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(storage.awrite('data', iter(rows), chunk_size=10))
+        assert loop.run_until_complete(storage.aread('data')) == rows
+        assert loop.run_until_complete(
+            storage.aread('data', fields=['id'], where=[('id', '>', 22)])) == [[23], [24]]
+    finally:
+        loop.close()
+
+
+def test_storage_stats_callback():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'name', 'type': 'string', 'constraints': {'pattern': '[a-z]+'}},
+        ],
+        'primaryKey': 'id',
+    }
+    stats = []
+    storage = Storage(stats_callback=stats.append)
+    storage.create('data', schema)
+    storage.write('data', [['1', 'a'], ['2', 'b'], ['3', 'a']])
+    storage.read('data')
+    storage.describe('data')
+    assert [(item.operation, item.bucket, item.rows) for item in stats] == [
+        ('write', 'data', 3), ('iter', 'data', 3), ('describe', 'data', 0),
+    ]
+    assert list(stats[0].phases) == ['transpose', 'cast', 'index', 'data', 'dataframe']
+    assert stats[0].counters == {'vectorized_casts': 3, 'unique_casts': 2}
+    assert list(stats[1].phases) == ['consolidate', 'restore']
+    assert stats[1].counters == {'vectorized_restores': 3, 'cell_restores': 3}
+    assert stats[1].to_dict()['phases']['restore']['calls'] == 1
+
+
+def test_storage_concurrency():
+    schema = {
+        'fields': [
+            {'name': 'id', 'type': 'integer'},
+            {'name': 'value', 'type': 'integer'},
+        ],
+        'primaryKey': 'id',
+    }
+    storage = Storage(consolidate_threshold=3)
+    storage.create(['bucket0', 'bucket1'], [schema, schema])
+    errors = []
+
+    def write(bucket, start):
+        for first in range(start, start + 200, 10):
+            storage.write(bucket, [[key, key * 2] for key in range(first, first + 10)])
+            storage.write(bucket, [[first, first * 2]], mode='upsert')
+
+    def read(bucket):
+        for number in range(20):
+            rows = storage.read(bucket)
+            assert len(rows) % 10 == 0
+            assert len(set(row[0] for row in rows)) == len(rows)
+            assert all(value == key * 2 for key, value in rows)
+            assert set(['bucket0', 'bucket1']).issubset(storage.buckets)
+
+    def recreate(bucket):
+        for number in range(20):
+            storage.create(bucket, schema, force=True)
+            storage.write(bucket, [[1, 2]], mode='ignore')
+            storage.iter(bucket)
+            storage.delete(bucket, ignore=True)
+
+    def run(target, *args):
+        try:
+            target(*args)
+        except Exception as exception:
+            errors.append(exception)
+
+    targets = []
+    for bucket in ['bucket0', 'bucket1']:
+        targets.extend([(write, bucket, 0), (write, bucket, 1000), (read, bucket)])
+    targets.extend([(recreate, 'temporary0'), (recreate, 'temporary1')])
+    threads = [threading.Thread(target=run, args=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert storage.buckets == ['bucket0', 'bucket1']
+    for bucket in ['bucket0', 'bucket1']:
+        rows = storage.read(bucket)
+        keys = list(range(200)) + list(range(1000, 1200))
+        assert sorted(rows) == [[key, key * 2] for key in keys]
 
 
 # Helpers